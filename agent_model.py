@@ -0,0 +1,265 @@
+"""Modo basado en individuos sobre un mapa 2D del parque.
+
+Cada zorro y cada conejo es un agente con posición propia; la depredación
+ocurre por proximidad y las zanahorias crecen en ``CARROT_PATCHES`` x
+``CARROT_PATCHES`` parcelas hasta un tope por parcela derivado de
+``max_carrots``. Los conejos sólo se reproducen y
+sobreviven en la medida en que comen: las zanahorias limitan la población.
+
+Los agentes se guardan como estructura de arreglos de NumPy y las búsquedas
+de vecinos usan una malla uniforme (spatial hash) con celdas del tamaño del
+radio de caza. El mapa se agranda al reiniciar para que ni la población
+inicial ni la que pueden alimentar las zanahorias pasen de ``MAX_DENSITY``;
+así cada celda tiene en promedio un número acotado de agentes y el costo por
+día es proporcional al número de agentes y no a sus pares. Los totales
+alimentan el ``history`` normal.
+"""
+
+import math
+
+import numpy as np
+
+from ecosystem_engine import EcosystemEngine
+
+# Agentes por unidad de área por encima de la cual el mapa se agranda
+MAX_DENSITY = 0.2
+
+# Parcelas de zanahorias por lado del mapa
+CARROT_PATCHES = 5
+
+# Probabilidad diaria de morir de hambre de un conejo que no encontró
+# zanahorias (proporcional a la parte de su ración que le faltó)
+STARVATION_RATE = 0.02
+
+# Una parcela agotada vuelve a brotar desde esta fracción de su tope
+CARROT_SEED = 0.1
+
+
+class UniformGrid:
+    """Índice espacial de malla uniforme sobre un mapa toroidal"""
+
+    def __init__(self, width, height, cell_size):
+        self.cell_size = cell_size
+        self.nx = max(1, int(np.ceil(width / cell_size)))
+        self.ny = max(1, int(np.ceil(height / cell_size)))
+        self.width = self.nx * cell_size
+        self.height = self.ny * cell_size
+        self.n_cells = self.nx * self.ny
+
+    def cell_of(self, x, y):
+        cx = np.minimum((x / self.cell_size).astype(np.int64), self.nx - 1)
+        cy = np.minimum((y / self.cell_size).astype(np.int64), self.ny - 1)
+        return cy * self.nx + cx
+
+    def build(self, x, y):
+        """Ordenar los puntos por celda: devuelve (orden, inicio por celda, cantidad por celda)"""
+        cells = self.cell_of(x, y)
+        order = np.argsort(cells, kind="stable")
+        counts = np.bincount(cells, minlength=self.n_cells)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        return order, starts, counts
+
+    def pairs_within(self, qx, qy, x, y, radius, index=None):
+        """Pares (consulta, punto) a distancia <= radius mirando las 3x3 celdas vecinas.
+
+        ``radius`` no debe superar ``cell_size``.
+        """
+        if index is None:
+            index = self.build(x, y)
+        order, starts, counts = index
+
+        qcx = np.minimum((qx / self.cell_size).astype(np.int64), self.nx - 1)
+        qcy = np.minimum((qy / self.cell_size).astype(np.int64), self.ny - 1)
+
+        queries, points = [], []
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                cells = ((qcy + dy) % self.ny) * self.nx + (qcx + dx) % self.nx
+                n = counts[cells]
+                total = int(n.sum())
+                if total == 0:
+                    continue
+                # Expandir cada consulta a todos los puntos de la celda vecina
+                query = np.repeat(np.arange(len(qx)), n)
+                offsets = np.arange(total) - np.repeat(np.cumsum(n) - n, n)
+                queries.append(query)
+                points.append(order[starts[cells][query] + offsets])
+
+        if not queries:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+
+        queries = np.concatenate(queries)
+        points = np.concatenate(points)
+
+        # Distancia en el toro
+        ddx = np.abs(qx[queries] - x[points])
+        ddy = np.abs(qy[queries] - y[points])
+        ddx = np.minimum(ddx, self.width - ddx)
+        ddy = np.minimum(ddy, self.height - ddy)
+        near = ddx * ddx + ddy * ddy <= radius * radius
+        return queries[near], points[near]
+
+
+class AgentEcosystemEngine(EcosystemEngine):
+    def __init__(self, params=None, width=100.0, height=100.0, cell_size=None,
+                 catch_radius=1.5, move_step=1.0, seed=None):
+        """``width`` y ``height`` son el tamaño mínimo del mapa; ``cell_size``
+        (por defecto, el radio de caza) no puede ser menor que ``catch_radius``."""
+        self.min_size = (width, height)
+        self.cell_size = max(cell_size or catch_radius, catch_radius)
+        self.catch_radius = catch_radius
+        self.move_step = move_step
+        self.seed = seed
+        super().__init__(params)
+
+    def map_size(self, agents):
+        """Tamaño del mapa para ``agents`` agentes (misma proporción que el mínimo)"""
+        width, height = self.min_size
+        scale = math.sqrt(max(1.0, agents / (MAX_DENSITY * width * height)))
+        return width * scale, height * scale
+
+    def rabbit_capacity(self):
+        """Conejos que puede alimentar el rebrote diario de todas las zanahorias en el tope"""
+        p = self.params
+        regrowth = p['max_carrots'] * p['carrot_growth_rate'] / 100
+        return regrowth / p['carrots_per_rabbit_per_day'] if p['carrots_per_rabbit_per_day'] else 0
+
+    def reset(self):
+        rng = self.rng = np.random.default_rng(self.seed)
+
+        # Estructura de arreglos: una columna por atributo
+        n_foxes = int(round(self.params['foxes_init']))
+        n_rabbits = int(round(self.params['rabbits_init']))
+        self.create_grids(*self.map_size(max(n_foxes + n_rabbits, self.rabbit_capacity())))
+        grid = self.grid
+        self.fox_x = rng.random(n_foxes) * grid.width
+        self.fox_y = rng.random(n_foxes) * grid.height
+        self.rabbit_x = rng.random(n_rabbits) * grid.width
+        self.rabbit_y = rng.random(n_rabbits) * grid.height
+
+        # Zanahorias repartidas por igual en las parcelas, con tope por parcela
+        patches = self.patches.n_cells
+        self.cell_cap = self.params['max_carrots'] / patches
+        self.cell_carrots = np.full(patches, min(self.params['carrots_init'] / patches, self.cell_cap))
+
+        self.day = 0
+        self.history.clear()
+        self.update_totals()
+        self.notify()
+
+    def create_grids(self, width, height):
+        """Malla de búsqueda de vecinos y parcelas de zanahorias (alineadas con ella)"""
+        grid = self.grid = UniformGrid(width, height, self.cell_size)
+        cells_per_patch = max(1, math.ceil(max(grid.nx, grid.ny) / CARROT_PATCHES))
+        self.patches = UniformGrid(grid.width, grid.height, self.cell_size * cells_per_patch)
+
+    def get_state(self):
+        state = super().get_state()
+        state.update(rng=self.rng.bit_generator.state, cell_cap=self.cell_cap,
+                     map_size=(self.grid.width, self.grid.height),
+                     cell_carrots=self.cell_carrots.copy(),
+                     fox_x=self.fox_x.copy(), fox_y=self.fox_y.copy(),
+                     rabbit_x=self.rabbit_x.copy(), rabbit_y=self.rabbit_y.copy())
+        return state
+
+    def set_state(self, state):
+        self.rng.bit_generator.state = state['rng']
+        self.create_grids(*state['map_size'])
+        self.cell_cap = state['cell_cap']
+        for name in ('cell_carrots', 'fox_x', 'fox_y', 'rabbit_x', 'rabbit_y'):
+            setattr(self, name, state[name].copy())
+        super().set_state(state)
+
+    def update_totals(self):
+        self.foxes = float(len(self.fox_x))
+        self.rabbits = float(len(self.rabbit_x))
+        self.carrots = float(self.cell_carrots.sum())
+
+    def move(self, x, y):
+        angle = self.rng.random(len(x)) * (2 * np.pi)
+        x += np.cos(angle) * self.move_step
+        y += np.sin(angle) * self.move_step
+        np.mod(x, self.grid.width, out=x)
+        np.mod(y, self.grid.height, out=y)
+
+    def offspring(self, x, y, rate):
+        """Posiciones de las crías: cada agente se reproduce con probabilidad ``rate``"""
+        parents = self.rng.random(len(x)) < rate
+        jitter = self.move_step * 0.5
+        count = int(parents.sum())
+        child_x = np.mod(x[parents] + self.rng.uniform(-jitter, jitter, count), self.grid.width)
+        child_y = np.mod(y[parents] + self.rng.uniform(-jitter, jitter, count), self.grid.height)
+        return child_x, child_y
+
+    def step_agents(self):
+        p = self.params
+        rng = self.rng
+        grid = self.grid
+
+        self.move(self.fox_x, self.fox_y)
+        self.move(self.rabbit_x, self.rabbit_y)
+
+        # 1. Zorros cazan un conejo cercano (cada conejo sólo puede ser cazado una vez)
+        foxes_fed = np.zeros(len(self.fox_x), dtype=bool)
+        eaten = np.zeros(len(self.rabbit_x), dtype=bool)
+        if len(self.fox_x) and len(self.rabbit_x):
+            hunters, prey = grid.pairs_within(self.fox_x, self.fox_y,
+                                              self.rabbit_x, self.rabbit_y, self.catch_radius)
+            if len(hunters):
+                shuffle = rng.permutation(len(hunters))
+                hunters, prey = hunters[shuffle], prey[shuffle]
+                _, first = np.unique(hunters, return_index=True)
+                hunters, prey = hunters[first], prey[first]
+                _, first = np.unique(prey, return_index=True)
+                hunters, prey = hunters[first], prey[first]
+                success = rng.random(len(hunters)) < p['rabbits_per_fox_per_day']
+                foxes_fed[hunters[success]] = True
+                eaten[prey[success]] = True
+
+        # 2. Conejos comen las zanahorias de su celda; si no alcanzan, cada uno
+        # recibe la misma parte de su ración
+        fed = np.ones(len(self.rabbit_x))
+        if len(self.rabbit_x):
+            patches = self.patches
+            cells = patches.cell_of(self.rabbit_x, self.rabbit_y)
+            demand = np.bincount(cells, minlength=patches.n_cells) * p['carrots_per_rabbit_per_day']
+            eaten_carrots = np.minimum(self.cell_carrots, demand)
+            self.cell_carrots -= eaten_carrots
+            share = np.divide(eaten_carrots, demand, out=np.ones(patches.n_cells), where=demand > 0)
+            fed = share[cells]
+
+        # 3. Nacimientos y muertes
+        # Zorros: mueren por tasa de muerte y se reproducen si comieron
+        fox_children = self.offspring(self.fox_x[foxes_fed], self.fox_y[foxes_fed], 0.1)
+        fox_alive = rng.random(len(self.fox_x)) >= p['fox_death_rate']
+        self.fox_x = np.concatenate((self.fox_x[fox_alive], fox_children[0]))
+        self.fox_y = np.concatenate((self.fox_y[fox_alive], fox_children[1]))
+
+        # Conejos: mueren por depredación, tasa de muerte y hambre; se reproducen
+        # en proporción a lo que comieron
+        survivors = ~eaten
+        rabbit_children = self.offspring(self.rabbit_x[survivors], self.rabbit_y[survivors],
+                                         p['rabbit_birth_rate'] * fed[survivors])
+        survivors &= rng.random(len(self.rabbit_x)) >= p['rabbit_death_rate']
+        survivors &= rng.random(len(self.rabbit_x)) >= STARVATION_RATE * (1 - fed)
+        self.rabbit_x = np.concatenate((self.rabbit_x[survivors], rabbit_children[0]))
+        self.rabbit_y = np.concatenate((self.rabbit_y[survivors], rabbit_children[1]))
+
+        # Zanahorias: crecen en cada parcela hasta el tope
+        np.maximum(self.cell_carrots, self.cell_cap * CARROT_SEED, out=self.cell_carrots)
+        self.cell_carrots *= 1 + p['carrot_growth_rate'] / 100
+        np.minimum(self.cell_carrots, self.cell_cap, out=self.cell_carrots)
+
+    def run(self, days, notify=True):
+        history = self.history
+        history.reserve(days)
+        for _ in range(days):
+            # Guardar estado actual
+            history.append(self.day, self.foxes, self.rabbits, self.carrots)
+            self.step_agents()
+            self.update_totals()
+            self.day += 1
+
+        if notify:
+            self.notify()
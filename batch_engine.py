@@ -0,0 +1,203 @@
+"""Motor vectorizado con NumPy para barridos de parámetros.
+
+Avanza K ecosistemas independientes a la vez aplicando exactamente las
+mismas reglas que ``EcosystemEngine.run`` (incluidos los recortes con
+``min``/``max`` y el tope ``max_carrots``), pero como operaciones sobre
+arreglos en lugar de un bucle de Python por escenario.
+"""
+
+import numpy as np
+
+from ecosystem_engine import DEFAULT_PARAMS
+
+# Orden de las columnas de la matriz de parámetros (K, n_params)
+PARAM_KEYS = tuple(DEFAULT_PARAMS)
+
+
+def params_matrix(param_dicts, keys=PARAM_KEYS):
+    """Construir la matriz (K, n_params) a partir de una lista de diccionarios.
+
+    Las claves que falten se completan con ``DEFAULT_PARAMS``.
+    """
+    rows = [[d.get(key, DEFAULT_PARAMS[key]) for key in keys] for d in param_dicts]
+    return np.array(rows, dtype=np.float64).reshape(len(rows), len(keys))
+
+
+def params_grid(**ranges):
+    """Producto cartesiano de rangos de parámetros como matriz (K, n_params).
+
+    Ejemplo: ``params_grid(fox_death_rate=[0.01, 0.05], max_carrots=range(100, 1000, 100))``
+    """
+    for key in ranges:
+        if key not in DEFAULT_PARAMS:
+            raise KeyError(f"Parámetro desconocido: {key}")
+
+    base = np.array([DEFAULT_PARAMS[key] for key in PARAM_KEYS], dtype=np.float64)
+    axes = [np.asarray(list(values), dtype=np.float64) for values in ranges.values()]
+    if not axes:
+        return base.reshape(1, -1)
+
+    mesh = np.meshgrid(*axes, indexing="ij")
+    count = mesh[0].size
+    matrix = np.tile(base, (count, 1))
+    for key, column in zip(ranges, mesh):
+        matrix[:, PARAM_KEYS.index(key)] = column.ravel()
+    return matrix
+
+
+def py_min(a, b, out):
+    """``min(a, b)`` de Python elemento a elemento (también con NaN): b sólo si b < a"""
+    np.copyto(out, a)
+    np.copyto(out, b, where=b < a)
+
+
+class BatchEcosystemEngine:
+    def __init__(self, params, keys=PARAM_KEYS):
+        params = np.asarray(params, dtype=np.float64)
+        if params.ndim != 2 or params.shape[1] != len(keys):
+            raise ValueError(f"Se esperaba una matriz (K, {len(keys)}) de parámetros")
+
+        self.keys = tuple(keys)
+        self.params = params
+        self.reset()
+
+    def __len__(self):
+        return self.params.shape[0]
+
+    def column(self, key):
+        return self.params[:, self.keys.index(key)]
+
+    def reset(self):
+        self.day = 0
+        self.foxes = self.column('foxes_init').copy()
+        self.rabbits = self.column('rabbits_init').copy()
+        self.carrots = self.column('carrots_init').copy()
+
+    @np.errstate(over='ignore', invalid='ignore')
+    def run(self, days, record=False):
+        """Avanzar todos los escenarios ``days`` días.
+
+        Con ``record=True`` devuelve un diccionario con las poblaciones al
+        inicio de cada día, con forma (days, K), igual que ``history``.
+        Los recortes reproducen ``min``/``max`` de Python (``fmax`` trata NaN
+        como ``max(0, nan) == 0``), así que los resultados coinciden bit a bit
+        con ``EcosystemEngine`` incluso cuando una población diverge.
+        """
+        rabbits_per_fox = self.column('rabbits_per_fox_per_day')
+        carrots_per_rabbit = self.column('carrots_per_rabbit_per_day')
+        fox_death_rate = self.column('fox_death_rate')
+        rabbit_birth_rate = self.column('rabbit_birth_rate')
+        rabbit_death_rate = self.column('rabbit_death_rate')
+        carrot_growth = self.column('carrot_growth_rate') / 100
+        max_carrots = self.column('max_carrots')
+
+        foxes, rabbits, carrots = self.foxes, self.rabbits, self.carrots
+
+        history = None
+        if record:
+            k = len(self)
+            history = {
+                'day': np.arange(self.day, self.day + days),
+                'foxes': np.empty((days, k)),
+                'rabbits': np.empty((days, k)),
+                'carrots': np.empty((days, k))
+            }
+
+        # Buffers reutilizados para no reservar memoria en cada día
+        rabbits_eaten = np.empty_like(foxes)
+        carrots_eaten = np.empty_like(foxes)
+        fox_survival = np.empty_like(foxes)
+        tmp = np.empty_like(foxes)
+
+        for i in range(days):
+            if record:
+                history['foxes'][i] = foxes
+                history['rabbits'][i] = rabbits
+                history['carrots'][i] = carrots
+
+            # 1. Zorros comen conejos
+            np.multiply(foxes, rabbits_per_fox, out=tmp)
+            py_min(rabbits, tmp, rabbits_eaten)
+
+            # 2. Conejos comen zanahorias
+            np.multiply(rabbits, carrots_per_rabbit, out=tmp)
+            py_min(carrots, tmp, carrots_eaten)
+
+            # 3. Zorros: mueren por tasa de muerte, pero crecen si hay comida
+            np.multiply(foxes, fox_death_rate, out=tmp)
+            np.subtract(rabbits_eaten, tmp, out=fox_survival)
+            np.fmax(fox_survival, 0, out=fox_survival)
+            np.subtract(foxes, tmp, out=foxes)
+            np.multiply(fox_survival, 0.1, out=fox_survival)
+            np.add(foxes, fox_survival, out=foxes)
+            np.fmax(foxes, 0, out=foxes)
+
+            # Conejos: mueren por depredación y tasa de muerte, pero se reproducen
+            np.multiply(rabbits, rabbit_birth_rate, out=tmp)
+            np.multiply(rabbits, rabbit_death_rate, out=fox_survival)
+            np.subtract(rabbits, rabbits_eaten, out=rabbits)
+            np.add(rabbits, tmp, out=rabbits)
+            np.subtract(rabbits, fox_survival, out=rabbits)
+            np.fmax(rabbits, 0, out=rabbits)
+
+            # Zanahorias: son comidas pero crecen
+            np.multiply(carrots, carrot_growth, out=tmp)
+            np.subtract(carrots, carrots_eaten, out=carrots)
+            np.add(carrots, tmp, out=carrots)
+            np.fmax(carrots, 0, out=carrots)
+            np.minimum(carrots, max_carrots, out=carrots)
+
+        self.day += days
+        return history
+
+
+class BatchCycleDetector:
+    """Algoritmo de Brent vectorizado: un detector de ciclos por escenario.
+
+    Igual que ``steady_state.CycleDetector``, pero sobre los arreglos de
+    ``BatchEcosystemEngine``; ``period`` queda en 0 mientras no se detecta nada.
+    """
+
+    def __init__(self, engine, tolerance=0.0):
+        k = len(engine)
+        self.tolerance = tolerance
+        self.tortoise = self.key(engine)
+        self.power = np.ones(k, dtype=np.int64)
+        self.lam = np.ones(k, dtype=np.int64)
+        self.period = np.zeros(k, dtype=np.int64)
+        self.active = np.ones(k, dtype=bool)
+
+    def key(self, engine):
+        state = np.stack((engine.foxes, engine.rabbits, engine.carrots), axis=1)
+        if self.tolerance:
+            with np.errstate(invalid='ignore'):
+                return np.where(np.isfinite(state), np.round(state / self.tolerance), state)
+        return state
+
+    def observe(self, engine):
+        """Comparar el estado actual; devuelve ``True`` cuando todos tienen ciclo"""
+        hare = self.key(engine)
+        same = (hare == self.tortoise) | (np.isnan(hare) & np.isnan(self.tortoise))
+        found = self.active & same.all(axis=1)
+        self.period[found] = self.lam[found]
+        self.active &= ~found
+
+        move = self.active & (self.power == self.lam)
+        self.tortoise[move] = hare[move]
+        self.power[move] *= 2
+        self.lam[move] = 0
+        self.lam += 1
+        return not self.active.any()
+
+    def extrapolate(self, engine, days):
+        """Avanzar ``days`` días usando el ciclo de cada escenario (todos detectados)"""
+        phase = days % self.period
+        foxes, rabbits, carrots = engine.foxes.copy(), engine.rabbits.copy(), engine.carrots.copy()
+        day = engine.day
+        # Sólo hace falta simular la fase dentro del ciclo
+        for step in range(1, int(phase.max(initial=0)) + 1):
+            engine.run(1)
+            hit = phase == step
+            foxes[hit], rabbits[hit], carrots[hit] = engine.foxes[hit], engine.rabbits[hit], engine.carrots[hit]
+        engine.foxes, engine.rabbits, engine.carrots = foxes, rabbits, carrots
+        engine.day = day + days
@@ -0,0 +1,326 @@
+"""Banco de pruebas de rendimiento del motor y de los gráficos.
+
+Mide:
+
+* días por segundo del paso diario (``step``, como ``simulate_day``) y de
+  ``run`` en bloque, para varios horizontes, con el núcleo compilado
+  (``step_kernel``, si Numba está instalado) y con el bucle de Python;
+* memoria del historial (``nbytes`` y pico de ``tracemalloc``);
+* tiempo por cuadro y cantidad de elementos del canvas de cada gráfico
+  (línea, barras, pastel) y de ``draw_3d_bar``, con historiales de 10 a
+  10^6 días;
+* tiempo de arranque de la interfaz hasta el primer cuadro dibujado, contra
+  el objetivo ``FIRST_FRAME_TARGET_MS``;
+* tiempo por cuadro del dibujo fuera de pantalla (``raster_renderer``, con
+  NumPy) y de su codificación PNG; no necesita pantalla;
+* tiempo por día y por agente del modelo de agentes (con NumPy), que debe
+  mantenerse casi constante al crecer la población.
+
+Los gráficos necesitan una pantalla; en un servidor se puede usar Xvfb::
+
+    xvfb-run -a python benchmark.py --output resultados.json
+    python benchmark.py --output nuevo.json --compare resultados.json
+
+Si Tk no puede abrir una ventana, esa parte se omite y se indica el motivo.
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import step_kernel
+from ecosystem_engine import EcosystemEngine
+
+try:
+    from tkinter import TclError
+except ImportError:
+    TclError = ImportError
+
+HORIZONS = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+HISTORY_LENGTHS = (10, 100, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+GRAPHS = ("line", "bar", "pie")
+AGENT_COUNTS = (2 * 10 ** 4, 2 * 10 ** 5)
+FIRST_FRAME_TARGET_MS = 300
+
+
+def timed(function, repeat):
+    """Tiempos (en segundos) de ``repeat`` llamadas a ``function``"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def bench_step(horizons, step_days=20000):
+    results = []
+
+    engine = EcosystemEngine()
+    elapsed = sum(timed(engine.step, step_days))
+    results.append({'name': 'step', 'days': step_days, 'seconds': elapsed,
+                    'days_per_sec': step_days / elapsed})
+
+    # Con Numba, ``run`` usa el núcleo compilado; se compila antes de medir
+    variants = [('run', True)]
+    if step_kernel.HAS_NUMBA:
+        EcosystemEngine().run(step_kernel.KERNEL_MIN_DAYS, notify=False)
+        variants.append(('python', False))
+
+    for name, compiled in variants:
+        for days in horizons:
+            engine = EcosystemEngine()
+            engine.compiled = compiled
+            start = time.perf_counter()
+            engine.run(days, notify=False)
+            elapsed = time.perf_counter() - start
+            results.append({'name': name, 'days': days, 'seconds': elapsed,
+                            'days_per_sec': days / elapsed})
+    return results
+
+
+def bench_memory(lengths):
+    results = []
+    for days in lengths:
+        tracemalloc.start()
+        engine = EcosystemEngine()
+        engine.run(days, notify=False)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append({'days': days, 'history_nbytes': engine.history.nbytes,
+                        'peak_bytes': peak})
+    return results
+
+
+def bench_startup():
+    """Importar la interfaz, crearla y esperar el primer cuadro (en milisegundos)"""
+    start = time.perf_counter()
+    import tkinter as tk
+
+    gui = importlib.import_module("Simulación_del_Sistema_Ecológico")
+    imported = time.perf_counter()
+    root = tk.Tk()
+    created = time.perf_counter()
+    app = gui.EcosystemSimulator(root)
+    built = time.perf_counter()
+    try:
+        while app.time_to_first_frame is None:
+            root.update()
+        first_frame = time.perf_counter()
+    finally:
+        root.destroy()
+    return {
+        'import_ms': (imported - start) * 1000,
+        'tk_ms': (created - imported) * 1000,
+        'construct_ms': (built - created) * 1000,
+        'first_frame_ms': (first_frame - start) * 1000,
+        'target_ms': FIRST_FRAME_TARGET_MS
+    }
+
+
+def open_simulator():
+    """Crear la interfaz en una ventana de tamaño fijo; devuelve (root, app)"""
+    import tkinter as tk
+
+    gui = importlib.import_module("Simulación_del_Sistema_Ecológico")
+    root = tk.Tk()
+    app = gui.EcosystemSimulator(root)
+    root.attributes('-fullscreen', False)
+    root.geometry("1600x1000+0+0")
+    root.update()
+    return root, app
+
+
+def bench_render(lengths, frames):
+    root, app = open_simulator()
+    canvas = app.graph_canvas
+    results = []
+    try:
+        for days in lengths:
+            engine = app.engine
+            engine.reset()
+            engine.run(days, notify=False)
+
+            for graph in GRAPHS:
+                app.current_graph = graph
+
+                def frame():
+                    app.draw_graph()
+                    root.update_idletasks()
+
+                # Primer cuadro: se construye la escena completa
+                app.invalidate_scene()
+                first = timed(frame, 1)[0]
+
+                # Cuadros siguientes: un día nuevo por cuadro, como en la simulación
+                def next_frame():
+                    engine.run(1, notify=False)
+                    frame()
+
+                times = timed(next_frame, frames)
+                results.append({
+                    'graph': graph, 'days': days,
+                    'first_frame_ms': first * 1000,
+                    'frame_ms': statistics.median(times) * 1000,
+                    'frame_max_ms': max(times) * 1000,
+                    'canvas_items': len(canvas.find_all())
+                })
+
+            # draw_3d_bar aislado, alternando alturas para forzar la copia del mosaico
+            app.current_graph = "bar"
+            app.draw_graph()
+            bar = app.scene['groups'][-1]['foxes']
+            tops = [100, 300]
+
+            def bar_frame():
+                tops.reverse()
+                app.draw_3d_bar(bar, 100, tops[0], 130, 500)
+
+            count = frames * 20
+            elapsed = sum(timed(bar_frame, count))
+            results.append({'graph': '3d_bar', 'days': days, 'frame_ms': elapsed / count * 1000})
+    finally:
+        root.destroy()
+    return results
+
+
+def bench_raster(lengths, frames, width=1600, height=700):
+    from raster_renderer import RasterRenderer, encode_png
+
+    renderer = RasterRenderer(width, height)
+    results = []
+    for days in lengths:
+        engine = EcosystemEngine()
+        engine.run(days, notify=False)
+        for graph in GRAPHS:
+            pixels = renderer.render(graph, engine)
+            render = statistics.median(timed(lambda: renderer.render(graph, engine), frames))
+            png = statistics.median(timed(lambda: encode_png(pixels), frames))
+            results.append({'graph': graph, 'days': days, 'frame_ms': render * 1000,
+                            'png_ms': png * 1000})
+    return results
+
+
+def bench_agents(counts, days=3, repeat=3):
+    from agent_model import AgentEcosystemEngine
+
+    results = []
+    for agents in counts:
+        # Cada repetición parte de la población inicial (la mejor de ``repeat``)
+        times = []
+        for _ in range(repeat):
+            engine = AgentEcosystemEngine({'foxes_init': agents // 10,
+                                           'rabbits_init': agents - agents // 10}, seed=1)
+            times.append(sum(timed(engine.step_agents, days)) / days)
+        best = min(times)
+        results.append({'agents': agents, 'step_ms': best * 1000,
+                        'us_per_agent': best / agents * 1e6})
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'python': sys.version.split()[0], 'platform': platform.platform(),
+            'commit': commit, 'time': time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def flatten(results):
+    """Métricas comparables: {nombre: valor} donde menor es mejor"""
+    metrics = {}
+    for row in results.get('step', []):
+        metrics[f"{row['name']}[{row['days']}] s/día"] = 1 / row['days_per_sec']
+    for row in results.get('memory', []):
+        metrics[f"memoria[{row['days']}] bytes"] = row['peak_bytes']
+    for row in results.get('render', []):
+        metrics[f"{row['graph']}[{row['days']}] ms"] = row['frame_ms']
+    for row in results.get('raster', []):
+        metrics[f"raster {row['graph']}[{row['days']}] ms"] = row['frame_ms']
+    for row in results.get('agents', []):
+        metrics[f"agentes[{row['agents']}] µs/agente"] = row['us_per_agent']
+    if 'startup' in results:
+        metrics["primer cuadro ms"] = results['startup']['first_frame_ms']
+    return metrics
+
+
+def compare(results, baseline):
+    new, old = flatten(results), flatten(baseline)
+    for name, value in new.items():
+        if name in old and old[name]:
+            ratio = value / old[name]
+            flag = "  ⚠" if ratio > 1.1 else ""
+            print(f"{name:32} {old[name]:12.4g} -> {value:12.4g}  x{ratio:.2f}{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banco de pruebas de rendimiento del simulador")
+    parser.add_argument("--output", help="Guardar los resultados en un archivo JSON")
+    parser.add_argument("--compare", metavar="JSON", help="Comparar con resultados anteriores")
+    parser.add_argument("--quick", action="store_true", help="Horizontes e historiales hasta 10^4")
+    parser.add_argument("--no-gui", action="store_true", help="Omitir los gráficos")
+    parser.add_argument("--frames", type=int, default=20, help="Cuadros medidos por caso")
+    args = parser.parse_args(argv)
+
+    horizons = [h for h in HORIZONS if not args.quick or h <= 10 ** 4]
+    lengths = [n for n in HISTORY_LENGTHS if not args.quick or n <= 10 ** 4]
+
+    results = {'meta': metadata()}
+    results['step'] = bench_step(horizons)
+    for row in results['step']:
+        print(f"{row['name']:5} {row['days']:>9} días  {row['days_per_sec']:14,.0f} días/s")
+
+    results['memory'] = bench_memory(lengths)
+    for row in results['memory']:
+        print(f"memoria {row['days']:>9} días  historial {row['history_nbytes']:>12,} B  "
+              f"pico {row['peak_bytes']:>12,} B")
+
+    try:
+        results['raster'] = bench_raster(lengths, args.frames)
+    except ImportError as error:  # Sin NumPy
+        print(f"Dibujo fuera de pantalla omitido: {error}")
+    for row in results.get('raster', []):
+        print(f"raster {row['graph']:4} {row['days']:>9} días  {row['frame_ms']:8.2f} ms/cuadro  "
+              f"PNG {row['png_ms']:6.2f} ms")
+
+    try:
+        results['agents'] = bench_agents([n for n in AGENT_COUNTS if not args.quick or n <= 10 ** 5])
+    except ImportError as error:  # Sin NumPy
+        print(f"Modelo de agentes omitido: {error}")
+    for row in results.get('agents', []):
+        print(f"agentes {row['agents']:>9}  {row['step_ms']:8.2f} ms/día  "
+              f"{row['us_per_agent']:6.3f} µs/agente")
+
+    if not args.no_gui:
+        try:
+            results['startup'] = startup = bench_startup()
+            status = "✓" if startup['first_frame_ms'] <= FIRST_FRAME_TARGET_MS else "⚠"
+            print(f"arranque: importar {startup['import_ms']:.0f} ms, construir "
+                  f"{startup['construct_ms']:.0f} ms, primer cuadro {startup['first_frame_ms']:.0f} ms "
+                  f"(objetivo {FIRST_FRAME_TARGET_MS} ms) {status}")
+            results['render'] = bench_render(lengths, args.frames)
+        except (ImportError, TclError) as error:  # Sin tkinter o sin pantalla
+            results['render_skipped'] = f"{type(error).__name__}: {error}"
+            print(f"Gráficos omitidos: {results['render_skipped']}")
+        for row in results.get('render', []):
+            items = f"{row['canvas_items']:>6} elementos" if 'canvas_items' in row else ""
+            print(f"{row['graph']:6} {row['days']:>9} días  {row['frame_ms']:8.2f} ms/cuadro  {items}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Puntos de control del motor: guardar, restaurar y saltar a un día.
+
+Un punto de control es un archivo binario pequeño::
+
+    b"ECOCKPT1"  día (int64)  zorros, conejos, zanahorias (float64)  longitud del resto
+    resto: estado completo de ``engine.get_state()`` serializado con pickle
+
+El encabezado fijo permite listar y elegir puntos de control sin
+deserializarlos. El estado incluye los parámetros, el estado del generador
+aleatorio (modelos estocástico y de agentes) y, si la corrida se graba con
+``TrajectoryRecorder``, la ruta y la fila del archivo de trayectoria que
+corresponde a ese día, para recuperar el historial tras un cierre inesperado.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import pickle
+import struct
+from array import array
+
+from trajectory_file import TrajectoryFile
+
+MAGIC = b"ECOCKPT1"
+HEADER = struct.Struct('<8sq3dq')
+LOAD_BLOCK = 1 << 16
+
+
+def params_key(params):
+    """Huella corta de los parámetros, para no mezclar corridas distintas"""
+    text = json.dumps(params, sort_keys=True)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:10]
+
+
+def dump_checkpoint(state):
+    payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+    header = HEADER.pack(MAGIC, state['day'], state['foxes'], state['rabbits'],
+                         state['carrots'], len(payload))
+    return header + payload
+
+
+def parse_checkpoint(data):
+    magic, day, foxes, rabbits, carrots, size = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("No es un punto de control")
+    return pickle.loads(data[HEADER.size:HEADER.size + size])
+
+
+def save_checkpoint(engine, path, trajectory=None):
+    """Escribir el estado del motor de forma atómica (archivo temporal + renombrar)"""
+    state = engine.get_state()
+    state['model'] = type(engine).__name__
+    if trajectory:
+        state['trajectory'] = trajectory
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(dump_checkpoint(state))
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path):
+    with open(path, 'rb') as f:
+        return parse_checkpoint(f.read())
+
+
+def read_checkpoint_header(path):
+    """Día y poblaciones de un punto de control, sin leer el resto"""
+    with open(path, 'rb') as f:
+        magic, day, foxes, rabbits, carrots, _ = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} no es un punto de control")
+    return day, foxes, rabbits, carrots
+
+
+def load_history(history, path, rows):
+    """Cargar en ``history`` las primeras ``rows`` filas de un archivo de trayectoria.
+
+    Devuelve ``False`` si el archivo no tiene tantas filas.
+    """
+    trajectory = TrajectoryFile(path)
+    try:
+        if trajectory.length < rows:
+            return False
+        history.clear()
+        columns = {name: trajectory.column(name) for name in ('day', 'foxes', 'rabbits', 'carrots')}
+        for start in range(0, rows, LOAD_BLOCK):
+            end = min(start + LOAD_BLOCK, rows)
+            history.extend({
+                name: array('q' if name == 'day' else 'd', column[start:end])
+                for name, column in columns.items()
+            })
+        return True
+    finally:
+        trajectory.close()
+
+
+class CheckpointManager:
+    """Observador que guarda un punto de control cada ``interval`` días.
+
+    Con ``directory=None`` los puntos de control se guardan en memoria (sirven
+    para saltar de día, no para recuperarse de un cierre). ``keep`` limita
+    cuántos se conservan por combinación de modelo y parámetros.
+    """
+
+    def __init__(self, engine, directory=None, interval=10000, keep=None, recorder=None):
+        self.engine = engine
+        self.directory = directory
+        self.interval = interval
+        self.keep = keep
+        self.recorder = recorder
+        self.memory = {}
+        self.last_mark = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        engine.add_observer(self)
+        self(engine)
+
+    def key(self, params=None):
+        return f"{type(self.engine).__name__}-{params_key(params or self.engine.params)}"
+
+    def __call__(self, engine):
+        mark = engine.day // self.interval
+        if mark != self.last_mark:
+            self.last_mark = mark
+            self.save()
+
+    def run(self, days):
+        """Simular ``days`` días deteniéndose en cada múltiplo de ``interval``"""
+        engine = self.engine
+        end = engine.day + days
+        while engine.day < end:
+            next_mark = (engine.day // self.interval + 1) * self.interval
+            engine.run(min(next_mark, end) - engine.day)
+
+    def trajectory_pointer(self):
+        recorder = self.recorder
+        if recorder is None or recorder.writer is None:
+            return None
+        return {'path': recorder.path, 'start_day': recorder.writer.start_day,
+                'rows': self.engine.day - recorder.writer.start_day}
+
+    def save(self):
+        """Guardar un punto de control del día actual"""
+        engine = self.engine
+        name = f"{self.key()}-{engine.day:012d}.ckpt"
+        if self.directory:
+            save_checkpoint(engine, os.path.join(self.directory, name), self.trajectory_pointer())
+        else:
+            state = engine.get_state()
+            state['model'] = type(engine).__name__
+            self.memory[name] = dump_checkpoint(state)
+        self.prune()
+
+    def checkpoints(self, key=None):
+        """Lista ordenada de (día, nombre) de los puntos de control de ``key``.
+
+        Con ``key=None`` se listan los de la combinación actual de modelo y
+        parámetros; con ``key='*'``, los de cualquier combinación del modelo.
+        """
+        key = self.key() if key is None else key
+        if key == '*':
+            key = f"{type(self.engine).__name__}-*"
+        if self.directory:
+            names = [os.path.basename(path)
+                     for path in glob.glob(os.path.join(self.directory, f"{key}-*.ckpt"))]
+        else:
+            prefix = key.rstrip('*')
+            names = [name for name in self.memory if name.startswith(prefix)]
+        return sorted((int(name[-17:-5]), name) for name in names)
+
+    def prune(self):
+        if not self.keep:
+            return
+        for _, name in self.checkpoints()[:-self.keep]:
+            if self.directory:
+                os.remove(os.path.join(self.directory, name))
+            else:
+                del self.memory[name]
+
+    def load(self, name):
+        if self.directory:
+            return load_checkpoint(os.path.join(self.directory, name))
+        return parse_checkpoint(self.memory[name])
+
+    def restore(self, name):
+        """Restaurar el motor desde un punto de control"""
+        engine = self.engine
+        state = self.load(name)
+        history = engine.history
+        day = state['day']
+
+        # Tras un cierre el historial en memoria no llega a ese día: recuperarlo del disco
+        first_day = history.buffers['day'][0] if len(history) else None
+        covered = first_day is not None and first_day <= day <= first_day + len(history)
+        pointer = state.get('trajectory')
+        if not covered and pointer and os.path.exists(pointer['path']):
+            covered = load_history(history, pointer['path'], pointer['rows'])
+            first_day = pointer['start_day']
+
+        # Seguir grabando el mismo archivo si el historial coincide con sus filas
+        recorder = self.recorder
+        if (recorder and pointer and covered and recorder.path == pointer['path']
+                and first_day == pointer['start_day']):
+            recorder.rewind(pointer['rows'], state['params'], pointer['start_day'])
+
+        self.last_mark = day // self.interval
+        engine.set_state(state)
+        return state
+
+    def resume(self):
+        """Restaurar el punto de control más reciente del modelo (con cualquier parámetro)"""
+        found = self.checkpoints('*')
+        if not found:
+            return None
+        _, name = max(found)
+        return self.restore(name)
+
+    def jump_to(self, day):
+        """Llevar la simulación al día ``day`` recalculando sólo lo necesario.
+
+        Parte del estado actual si está antes de ``day`` y más cerca que
+        cualquier punto de control; si no, del punto de control más cercano
+        anterior a ``day`` o, si no hay ninguno, del día 0. Un punto de
+        control posterior al día actual sólo se usa si restaurarlo conserva el
+        historial (ver ``keeps_history``); si no, se simula hacia adelante
+        desde el estado actual. Devuelve los días que hubo que simular.
+
+        La nueva simulación se corta en los mismos múltiplos de ``interval``
+        que ``run``. En el modelo continuo el paso adaptativo depende de dónde
+        termina cada bloque, así que el resultado coincide con la corrida
+        original sólo dentro de la tolerancia del integrador.
+        """
+        engine = self.engine
+        found = [(checkpoint_day, name) for checkpoint_day, name in self.checkpoints()
+                 if checkpoint_day <= day]
+        if engine.day <= day:
+            found = [(checkpoint_day, name) for checkpoint_day, name in found
+                     if checkpoint_day <= engine.day or self.keeps_history(name, checkpoint_day)]
+        best = max(found) if found else None
+
+        if engine.day <= day and (best is None or best[0] <= engine.day):
+            pass
+        elif best is not None:
+            self.restore(best[1])
+        else:
+            engine.reset()
+
+        remaining = day - engine.day
+        if remaining > 0:
+            self.run(remaining)
+        return remaining
+
+    def keeps_history(self, name, day):
+        """Si restaurar el punto de control ``name`` (del día ``day``) conserva el historial.
+
+        Es así cuando el historial en memoria llega hasta ese día o cuando el
+        punto de control apunta a un archivo de trayectoria con las filas
+        hasta ese día (``restore`` las vuelve a cargar). Si no, ``set_state``
+        empezaría el historial de nuevo en ese día y los gráficos quedarían
+        vacíos.
+        """
+        history = self.engine.history
+        if not len(history):
+            return True
+        first_day = history.buffers['day'][0]
+        if first_day <= day <= first_day + len(history):
+            return True
+        pointer = self.load(name).get('trajectory')
+        if not pointer or not os.path.exists(pointer['path']):
+            return False
+        trajectory = TrajectoryFile(pointer['path'])
+        try:
+            return trajectory.length >= pointer['rows']
+        finally:
+            trajectory.close()
+
+    def clear(self):
+        """Borrar los puntos de control de la combinación actual"""
+        for _, name in self.checkpoints():
+            if self.directory:
+                os.remove(os.path.join(self.directory, name))
+            else:
+                del self.memory[name]
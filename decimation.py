@@ -0,0 +1,260 @@
+"""Resumen multirresolución (mínimo, máximo y media por bloque) de las series.
+
+Cada serie del historial tiene una pirámide de niveles potencia de dos: el
+nivel ``k`` guarda, para cada bloque de ``2**k`` días, el índice del valor
+mínimo, el del máximo y la suma (de la que sale la media). Los niveles
+empiezan en ``BASE_LEVEL`` (o en el ``base_level`` de la pirámide): los
+bloques más chicos se recorren directamente en la columna, así la pirámide
+ocupa una fracción pequeña del historial.
+
+Para dibujar una ventana ``[start, end)`` en ``pixels`` columnas se elige el
+nivel que deja uno o dos bloques por píxel y se recorren sólo los bloques de
+la ventana; los bordes incompletos se resuelven con O(log n) bloques de
+niveles más finos. El costo depende del ancho en píxeles y no de los días de
+la ventana, y los picos y las extinciones (mínimos en cero) nunca
+desaparecen. La pirámide se extiende de forma incremental con los días
+nuevos y no se recalcula completa; si NumPy está instalado, los tramos
+largos de bloques nuevos se reducen vectorizados, con el mismo resultado
+bit a bit que el recorrido en Python.
+"""
+
+import importlib.util
+from array import array
+
+# Los bloques de menos de 2**BASE_LEVEL días no se guardan
+BASE_LEVEL = 4
+
+# Con NumPy, los tramos de al menos estos bloques nuevos se reducen como
+# matriz (un bloque por fila) en lugar de uno por uno
+VECTOR_MIN_BLOCKS = 64
+# Bloques por tramo al reducir así la base (acota los temporales)
+VECTOR_CHUNK_BLOCKS = 1 << 16
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+def scan(values, start, end):
+    """(índice del mínimo, índice del máximo, suma) de ``values[start:end]``"""
+    # Con una lista, ``index`` encuentra el mismo objeto aunque sea NaN
+    segment = values[start:end].tolist()
+    low, high = min(segment), max(segment)
+    return start + segment.index(low), start + segment.index(high), sum(segment)
+
+
+class MinMaxPyramid:
+    def __init__(self, store, name, base_level=BASE_LEVEL):
+        self.store = store
+        self.name = name
+        self.base_level = base_level
+        self.clear()
+
+    def clear(self):
+        # levels[k] = (índices de mínimos, índices de máximos, sumas) con bloques
+        # de 2**(base_level + k) días
+        self.levels = []
+
+    def truncate(self, length):
+        """Descartar los bloques que incluyen días desde ``length``"""
+        for k, level in enumerate(self.levels):
+            complete = length >> (self.base_level + k)
+            for column in level:
+                del column[complete:]
+        while self.levels and not self.levels[-1][0]:
+            self.levels.pop()
+
+    def update(self):
+        """Añadir los bloques completos que aparecieron desde la última llamada"""
+        values = self.store.buffers[self.name]
+        count = self.store.length >> self.base_level
+        if count and not self.levels:
+            self.levels.append((array('q'), array('q'), array('d')))
+
+        if self.levels:
+            first = len(self.levels[0][0])
+            if HAS_NUMPY and count - first >= VECTOR_MIN_BLOCKS:
+                self.add_base_blocks_numpy(values, first, count)
+            else:
+                self.add_base_blocks(values, first, count)
+
+        level = 1
+        while count >= 2:
+            if level == len(self.levels):
+                self.levels.append((array('q'), array('q'), array('d')))
+            complete = count // 2
+            first = len(self.levels[level][0])
+            if HAS_NUMPY and complete - first >= VECTOR_MIN_BLOCKS:
+                self.add_parent_blocks_numpy(values, level, first, complete)
+            else:
+                self.add_parent_blocks(values, level, first, complete)
+            count = complete
+            level += 1
+
+    def add_base_blocks(self, values, first, count):
+        mins, maxs, sums = self.levels[0]
+        size = 1 << self.base_level
+        for block in range(first, count):
+            lo, hi, total = scan(values, block * size, block * size + size)
+            mins.append(lo)
+            maxs.append(hi)
+            sums.append(total)
+
+    def add_base_blocks_numpy(self, values, first, count):
+        """``add_base_blocks`` con una fila de matriz por bloque"""
+        import numpy as np
+
+        size = 1 << self.base_level
+        column = np.asarray(values)
+        mins, maxs, sums = self.levels[0]
+        # Por tramos, para que los temporales no crezcan con el historial
+        for chunk in range(first, count, VECTOR_CHUNK_BLOCKS):
+            stop = min(count, chunk + VECTOR_CHUNK_BLOCKS)
+            blocks = column[chunk * size:stop * size].reshape(-1, size)
+            offsets = np.arange(chunk * size, stop * size, size)
+            lows = offsets + blocks.argmin(axis=1)
+            highs = offsets + blocks.argmax(axis=1)
+            # ``cumsum`` suma de izquierda a derecha, como ``sum``; el ``+ 0.0``
+            # repite su ``0 +`` inicial (un bloque de -0.0 suma 0.0)
+            with np.errstate(invalid='ignore'):
+                totals = np.cumsum(blocks, axis=1)[:, -1] + 0.0
+            # ``argmin`` se detiene en un NaN y ``min`` no: esos bloques van por ``scan``
+            for row in np.flatnonzero(np.isnan(totals)):
+                lows[row], highs[row], totals[row] = scan(values, offsets[row], offsets[row] + size)
+            mins.frombytes(lows.astype(np.int64).tobytes())
+            maxs.frombytes(highs.astype(np.int64).tobytes())
+            sums.frombytes(totals.tobytes())
+
+    def add_parent_blocks(self, values, level, first, complete):
+        mins, maxs, sums = self.levels[level]
+        child_mins, child_maxs, child_sums = self.levels[level - 1]
+        for block in range(first, complete):
+            a = 2 * block
+            lo_a, lo_b = child_mins[a], child_mins[a + 1]
+            hi_a, hi_b = child_maxs[a], child_maxs[a + 1]
+            mins.append(lo_b if values[lo_b] < values[lo_a] else lo_a)
+            maxs.append(hi_b if values[hi_b] > values[hi_a] else hi_a)
+            sums.append(child_sums[a] + child_sums[a + 1])
+
+    def add_parent_blocks_numpy(self, values, level, first, complete):
+        """``add_parent_blocks`` combinando los pares de hijos a la vez"""
+        import numpy as np
+
+        column = np.asarray(values)
+        children = []
+        for child, dtype in zip(self.levels[level - 1], (np.int64, np.int64, np.float64)):
+            # Sólo los hijos que se combinan, sin copiar el nivel
+            pairs = np.frombuffer(child, dtype=dtype, count=2 * (complete - first),
+                                  offset=2 * first * child.itemsize)
+            children.append((pairs[0::2], pairs[1::2]))
+        (lo_a, lo_b), (hi_a, hi_b), (sum_a, sum_b) = children
+        # Mismas comparaciones que ``add_parent_blocks``: ante empate o NaN gana el primero
+        lows = np.where(column[lo_b] < column[lo_a], lo_b, lo_a)
+        highs = np.where(column[hi_b] > column[hi_a], hi_b, hi_a)
+        with np.errstate(invalid='ignore'):
+            totals = sum_a + sum_b
+        # Soltar las vistas antes de hacer crecer los arreglos
+        del column, children, lo_a, lo_b, hi_a, hi_b, sum_a, sum_b, pairs
+
+        mins, maxs, sums = self.levels[level]
+        mins.frombytes(lows.tobytes())
+        maxs.frombytes(highs.tobytes())
+        sums.frombytes(totals.tobytes())
+
+    def extremes(self, start, end):
+        """(índice del mínimo, índice del máximo, suma) de ``[start, end)``.
+
+        Se recorre con los bloques alineados más grandes que caben, así que
+        cuesta O(log n) más, a lo sumo, dos tramos de menos de
+        ``2**base_level`` días.
+        """
+        values = self.store.buffers[self.name]
+        levels = self.levels
+        base = 1 << self.base_level
+        lo = hi = None
+        total = 0.0
+        position = start
+        while position < end:
+            # Nivel más alto con un bloque que empieza en ``position`` y cabe en el rango
+            alignment = (position & -position).bit_length() - 1 if position else len(levels) + self.base_level
+            k = min(len(levels), alignment - self.base_level + 1) - 1
+            while k >= 0:
+                size = base << k
+                if position + size <= end and position // size < len(levels[k][0]):
+                    break
+                k -= 1
+
+            if k < 0:
+                stop = min(end, (position // base + 1) * base)
+                block_lo, block_hi, block_total = scan(values, position, stop)
+                position = stop
+            else:
+                mins, maxs, sums = levels[k]
+                block = position // size
+                block_lo, block_hi, block_total = mins[block], maxs[block], sums[block]
+                position += size
+
+            if lo is None or values[block_lo] < values[lo]:
+                lo = block_lo
+            if hi is None or values[block_hi] > values[hi]:
+                hi = block_hi
+            total += block_total
+        return lo, hi, total
+
+    def summary(self, start, end):
+        """(mínimo, máximo, media) de ``[start, end)``"""
+        self.update()
+        values = self.store.buffers[self.name]
+        lo, hi, total = self.extremes(start, end)
+        return values[lo], values[hi], total / (end - start)
+
+    def window(self, start, end, pixels):
+        """Índices a dibujar de ``[start, end)`` en ``pixels`` columnas (1-2 por columna)"""
+        self.update()
+        pixels = max(1, int(pixels))
+        span = end - start
+        if span <= 2 * pixels:
+            return range(start, end)
+
+        # Nivel más fino cuyo número de bloques en la ventana cabe en el ancho
+        level = 1
+        while (span >> level) > pixels:
+            level += 1
+        size = 1 << level
+
+        result = [start]
+
+        def add(lo, hi):
+            first, second = (lo, hi) if lo <= hi else (hi, lo)
+            if first != result[-1]:
+                result.append(first)
+            if second != first:
+                result.append(second)
+
+        k = level - self.base_level
+        if k < 0 or k >= len(self.levels):
+            # Bloques más chicos que la base: se recorre la columna (a lo sumo
+            # 2**base_level valores por píxel)
+            values = self.store.buffers[self.name]
+            for a in range(start, end, size):
+                lo, hi, _ = scan(values, a, min(a + size, end))
+                add(lo, hi)
+        else:
+            mins, maxs, _ = self.levels[k]
+            first = -(-start // size)
+            last = min(end // size, len(mins))
+            # Bordes incompletos (y cola aún sin bloque) con bloques más finos
+            if first * size > start:
+                lo, hi, _ = self.extremes(start, min(end, first * size))
+                add(lo, hi)
+            for block in range(first, last):
+                add(mins[block], maxs[block])
+            if max(first, last) * size < end:
+                lo, hi, _ = self.extremes(max(start, max(first, last) * size), end)
+                add(lo, hi)
+
+        if result[-1] != end - 1:
+            result.append(end - 1)
+        return result
+
+    def indices(self, pixels):
+        """Índices a dibujar de todo el historial para ``pixels`` columnas"""
+        return self.window(0, self.store.length, pixels)
@@ -0,0 +1,220 @@
+"""Motor de simulación del ecosistema, independiente de Tkinter.
+
+Contiene el modelo diario zorros/conejos/zanahorias que antes vivía en
+``EcosystemSimulator.simulate_day``. Se puede importar y ejecutar en
+servidores sin pantalla; la interfaz gráfica sólo lo observa.
+"""
+
+import time
+
+import step_kernel
+from history_store import HistoryStore
+
+# Parámetros iniciales por defecto
+DEFAULT_PARAMS = {
+    'foxes_init': 10,
+    'rabbits_init': 50,
+    'carrots_init': 200,
+    'rabbits_per_fox_per_day': 0.5,
+    'carrots_per_rabbit_per_day': 2.0,
+    'carrot_growth_rate': 15,
+    'fox_death_rate': 0.05,
+    'rabbit_death_rate': 0.03,
+    'rabbit_birth_rate': 0.1,
+    'max_carrots': 500
+}
+
+
+def next_state(foxes, rabbits, carrots, params):
+    """Estado del día siguiente con las mismas reglas (y operaciones) que ``run``"""
+    rabbits_eaten = min(rabbits, foxes * params['rabbits_per_fox_per_day'])
+    carrots_eaten = min(carrots, rabbits * params['carrots_per_rabbit_per_day'])
+
+    fox_death_rate = params['fox_death_rate']
+    fox_survival = max(0, rabbits_eaten - foxes * fox_death_rate)
+    new_foxes = max(0, foxes - foxes * fox_death_rate + fox_survival * 0.1)
+    new_rabbits = max(0, rabbits - rabbits_eaten +
+                      rabbits * params['rabbit_birth_rate'] -
+                      rabbits * params['rabbit_death_rate'])
+    new_carrots = max(0, carrots - carrots_eaten + carrots * (params['carrot_growth_rate'] / 100))
+    new_carrots = min(new_carrots, params['max_carrots'])
+    return new_foxes, new_rabbits, new_carrots
+
+
+class EcosystemEngine:
+    # Usar el núcleo compilado (Numba) en bloques largos si está instalado
+    compiled = True
+
+    def __init__(self, params=None):
+        self.params = dict(DEFAULT_PARAMS)
+        if params:
+            self.params.update(params)
+
+        self.observers = []
+        self.history = HistoryStore()
+        self.reset()
+
+    def add_observer(self, callback):
+        """Registrar una función que se llama tras cada avance o reinicio"""
+        self.observers.append(callback)
+
+    def remove_observer(self, callback):
+        if callback in self.observers:
+            self.observers.remove(callback)
+
+    def notify(self):
+        for callback in list(self.observers):
+            callback(self)
+
+    def reset(self):
+        self.day = 0
+        self.foxes = float(self.params['foxes_init'])
+        self.rabbits = float(self.params['rabbits_init'])
+        self.carrots = float(self.params['carrots_init'])
+        self.history.clear()
+        self.notify()
+
+    def state(self):
+        return self.day, self.foxes, self.rabbits, self.carrots
+
+    def get_state(self):
+        """Estado completo del motor (sin el historial) para un punto de control"""
+        return {
+            'day': self.day,
+            'foxes': self.foxes,
+            'rabbits': self.rabbits,
+            'carrots': self.carrots,
+            'params': dict(self.params)
+        }
+
+    def set_state(self, state):
+        """Restaurar un estado de ``get_state``.
+
+        Si el historial llega hasta ese día se recorta ahí; si no, empieza de
+        nuevo en el día restaurado.
+        """
+        self.params.update(state['params'])
+        self.day = state['day']
+        self.foxes = state['foxes']
+        self.rabbits = state['rabbits']
+        self.carrots = state['carrots']
+
+        history = self.history
+        first_day = history.buffers['day'][0] if len(history) else None
+        if first_day is not None and first_day <= self.day <= first_day + len(history):
+            history.truncate(self.day - first_day)
+        else:
+            history.clear()
+        self.notify()
+
+    def step(self):
+        """Avanzar un solo día"""
+        self.run(1)
+
+    def run(self, days, notify=True):
+        """Avanzar ``days`` días en un bucle sin llamadas a la interfaz.
+
+        Los observadores se notifican una sola vez al terminar el bloque.
+        Los bloques largos usan el núcleo compilado de ``step_kernel`` si
+        Numba está instalado; el resultado es idéntico al del bucle.
+        """
+        # Variables locales para evitar búsquedas en diccionarios dentro del bucle
+        p = self.params
+        rabbits_per_fox = p['rabbits_per_fox_per_day']
+        carrots_per_rabbit = p['carrots_per_rabbit_per_day']
+        fox_death_rate = p['fox_death_rate']
+        rabbit_birth_rate = p['rabbit_birth_rate']
+        rabbit_death_rate = p['rabbit_death_rate']
+        carrot_growth = p['carrot_growth_rate'] / 100
+        max_carrots = p['max_carrots']
+
+        # Escribir directamente en los buffers preasignados del historial
+        history = self.history
+        history.reserve(days)
+        h_day = history.buffers['day']
+        h_foxes = history.buffers['foxes']
+        h_rabbits = history.buffers['rabbits']
+        h_carrots = history.buffers['carrots']
+        i = history.length
+
+        day, foxes, rabbits, carrots = self.day, self.foxes, self.rabbits, self.carrots
+
+        if self.compiled and days >= step_kernel.KERNEL_MIN_DAYS and step_kernel.HAS_NUMBA:
+            # Misma recurrencia compilada, escribiendo en los mismos buffers
+            day, foxes, rabbits, carrots = step_kernel.run(
+                history, days, (day, foxes, rabbits, carrots),
+                (rabbits_per_fox, carrots_per_rabbit, fox_death_rate, rabbit_birth_rate,
+                 rabbit_death_rate, carrot_growth, max_carrots))
+            i += days
+            days = 0
+
+        for _ in range(days):
+            # Guardar estado actual
+            h_day[i] = day
+            h_foxes[i] = foxes
+            h_rabbits[i] = rabbits
+            h_carrots[i] = carrots
+            i += 1
+
+            # 1. Zorros comen conejos
+            rabbits_eaten = min(rabbits, foxes * rabbits_per_fox)
+
+            # 2. Conejos comen zanahorias
+            carrots_eaten = min(carrots, rabbits * carrots_per_rabbit)
+
+            # 3. Actualizar poblaciones
+            # Zorros: mueren por tasa de muerte, pero crecen si hay comida
+            fox_survival = max(0, rabbits_eaten - foxes * fox_death_rate)
+            foxes = max(0, foxes - foxes * fox_death_rate + fox_survival * 0.1)
+
+            # Conejos: mueren por depredación y tasa de muerte, pero se reproducen
+            rabbits = max(0, rabbits - rabbits_eaten +
+                          rabbits * rabbit_birth_rate -
+                          rabbits * rabbit_death_rate)
+
+            # Zanahorias: son comidas pero crecen
+            carrots = max(0, carrots - carrots_eaten + carrots * carrot_growth)
+            carrots = min(carrots, max_carrots)
+
+            day += 1
+
+        history.length = i
+        self.day, self.foxes, self.rabbits, self.carrots = day, foxes, rabbits, carrots
+
+        if notify:
+            self.notify()
+
+    def run_for(self, budget):
+        """Simular bloques de días hasta agotar ``budget`` segundos, sin notificar.
+
+        Devuelve el número de días simulados.
+        """
+        deadline = time.perf_counter() + budget
+        chunk = 1
+        total = 0
+        while True:
+            start = time.perf_counter()
+            self.run(chunk, notify=False)
+            total += chunk
+            now = time.perf_counter()
+            if now >= deadline:
+                return total
+            # Duplicar el bloque mientras quepa en el tiempo restante
+            if (now - start) * 2 < deadline - now:
+                chunk *= 2
+
+
+def run_headless(days, params=None):
+    """Ejecutar una simulación completa sin interfaz y devolver el motor"""
+    engine = EcosystemEngine(params)
+    engine.run(days)
+    return engine
+
+
+if __name__ == "__main__":
+    import sys
+
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    engine = run_headless(days)
+    print(f"Día {engine.day}: zorros={engine.foxes:.3f} "
+          f"conejos={engine.rabbits:.3f} zanahorias={engine.carrots:.3f}")
@@ -0,0 +1,125 @@
+"""Simulación en un hilo o proceso aparte con canal de instantáneas para la interfaz.
+
+El motor corre fuera del bucle de Tk y publica instantáneas (día, poblaciones
+y las filas del historial nuevas desde la instantánea anterior) en una cola
+que la interfaz consulta con ``after()``. Pausar, reanudar, reiniciar y
+cambiar parámetros se envían como comandos al trabajador.
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+
+from ecosystem_engine import EcosystemEngine
+
+
+def publish(engine, snapshots, generation, running):
+    """Enviar el estado y las filas nuevas; el historial del trabajador se vacía"""
+    snapshots.put({
+        'generation': generation,
+        'running': running,
+        'day': engine.day,
+        'foxes': engine.foxes,
+        'rabbits': engine.rabbits,
+        'carrots': engine.carrots,
+        'rows': engine.history.rows()
+    })
+    engine.history.clear()
+
+
+def worker_loop(engine_class, params, commands, snapshots, budget, publish_interval):
+    """Bucle del trabajador; se usa igual desde un hilo o desde un proceso"""
+    engine = engine_class(params)
+    running = False
+    generation = 0
+    last_publish = 0.0
+
+    while True:
+        try:
+            # En pausa se bloquea esperando comandos; en marcha sólo los consulta
+            command = commands.get_nowait() if running else commands.get()
+        except queue.Empty:
+            command = None
+
+        if command is not None:
+            name, args = command[0], command[1:]
+            if name == 'stop':
+                break
+            elif name == 'pause':
+                running = False
+                publish(engine, snapshots, generation, running)
+            elif name == 'resume':
+                running = True
+            elif name == 'reset':
+                generation, new_params = args
+                if new_params:
+                    engine.params.update(new_params)
+                engine.reset()
+                publish(engine, snapshots, generation, running)
+            elif name == 'set_params':
+                engine.params.update(args[0])
+            continue
+
+        engine.run_for(budget)
+
+        now = time.perf_counter()
+        if now - last_publish >= publish_interval:
+            last_publish = now
+            publish(engine, snapshots, generation, running)
+
+
+class EngineWorker:
+    def __init__(self, params=None, use_process=False, budget=0.008, publish_interval=1 / 30,
+                 engine_class=EcosystemEngine):
+        self.generation = 0
+        self.use_process = use_process
+
+        if use_process:
+            context = multiprocessing.get_context()
+            self.commands = context.Queue()
+            self.snapshots = context.Queue()
+            target = context.Process
+        else:
+            self.commands = queue.Queue()
+            self.snapshots = queue.Queue()
+            target = threading.Thread
+
+        self.task = target(target=worker_loop,
+                           args=(engine_class, params, self.commands, self.snapshots,
+                                 budget, publish_interval),
+                           daemon=True)
+
+    def start(self):
+        self.task.start()
+
+    def send(self, name, *args):
+        self.commands.put((name,) + args)
+
+    def pause(self):
+        self.send('pause')
+
+    def resume(self):
+        self.send('resume')
+
+    def reset(self, params=None):
+        # Las instantáneas de antes del reinicio se descartan por generación
+        self.generation += 1
+        self.send('reset', self.generation, params)
+
+    def set_params(self, params):
+        self.send('set_params', dict(params))
+
+    def stop(self):
+        self.send('stop')
+
+    def poll(self):
+        """Vaciar el canal y devolver las instantáneas de la generación actual"""
+        result = []
+        while True:
+            try:
+                snapshot = self.snapshots.get_nowait()
+            except queue.Empty:
+                return result
+            if snapshot['generation'] == self.generation:
+                result.append(snapshot)
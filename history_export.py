@@ -0,0 +1,269 @@
+"""Exportación en streaming del historial a CSV, JSON Lines y Parquet.
+
+Las filas se leen del historial por bloques de ``flush_size`` y se escriben
+de inmediato, así que el exportador nunca copia el historial completo. Hay
+tres formas de usarlo:
+
+* ``iter_batches`` / ``iter_rows``: iteradores sobre un historial existente.
+* ``HistoryExporter``: observador del motor que exporta mientras la
+  simulación corre (lo usa el botón "Exportar" de la interfaz).
+* ``export_headless``: corrida sin interfaz que vacía el historial tras cada
+  bloque, con memoria acotada aunque se simulen millones de días.
+
+Si el historial retrocede mientras se exporta (reinicio, salto a un punto de
+control anterior, ``truncate``), las filas ya escritas no se repiten ni se
+mezclan con marcas: se cierra el archivo y la exportación sigue en uno nuevo
+(``ruta.1``, ``ruta.2``, ..., como ``TrajectoryRecorder``). Cada parte es un
+archivo válido por sí mismo y sus filas reemplazan a las de las partes
+anteriores desde su primer día.
+
+CSV y JSON Lines se pueden comprimir con gzip (``.gz``) o zstd (``.zst``,
+requiere ``zstandard``); Parquet requiere ``pyarrow``.
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+
+from ecosystem_engine import EcosystemEngine
+
+COLUMNS = ('day', 'foxes', 'rabbits', 'carrots')
+DEFAULT_FLUSH_SIZE = 10000
+
+
+def iter_batches(history, start=0, end=None, batch_size=DEFAULT_FLUSH_SIZE):
+    """Bloques ``{columna: array}`` de como mucho ``batch_size`` filas"""
+    end = len(history) if end is None else end
+    for first in range(start, end, batch_size):
+        yield history.rows(first, min(first + batch_size, end))
+
+
+def iter_rows(history, start=0, end=None, batch_size=DEFAULT_FLUSH_SIZE):
+    """Filas ``(day, foxes, rabbits, carrots)`` leídas por bloques"""
+    for batch in iter_batches(history, start, end, batch_size):
+        yield from zip(*(batch[name] for name in COLUMNS))
+
+
+def simulate_batches(engine, days, batch_size=DEFAULT_FLUSH_SIZE):
+    """Simular ``days`` días y producir el historial por bloques.
+
+    Tras cada bloque se vacía el historial del motor, así que la memoria no
+    crece con la duración de la corrida (los agregados del historial se
+    pierden; el estado del motor sigue intacto).
+    """
+    history = engine.history
+    remaining = days
+    while remaining > 0:
+        chunk = min(batch_size, remaining)
+        history.clear()
+        engine.run(chunk, notify=False)
+        yield history.rows()
+        remaining -= chunk
+    history.clear()
+
+
+def open_text(path, compression):
+    if compression == 'gzip':
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    if compression == 'zstd':
+        import zstandard
+
+        raw = zstandard.ZstdCompressor().stream_writer(open(path, 'wb'))
+        return io.TextIOWrapper(raw, encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+class CSVSink:
+    def __init__(self, path, compression=None):
+        self.path = path
+        self.compression = compression
+        self.file = open_text(path, compression)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(COLUMNS)
+
+    def write_batch(self, batch):
+        self.writer.writerows(zip(*(batch[name] for name in COLUMNS)))
+
+    def close(self):
+        self.file.close()
+
+
+class JSONLinesSink:
+    def __init__(self, path, compression=None):
+        self.path = path
+        self.compression = compression
+        self.file = open_text(path, compression)
+
+    def write_batch(self, batch):
+        self.file.writelines(
+            json.dumps(dict(zip(COLUMNS, row))) + '\n'
+            for row in zip(*(batch[name] for name in COLUMNS))
+        )
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """Cada bloque se escribe como un grupo de filas del archivo Parquet"""
+
+    def __init__(self, path, compression='snappy'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.path = path
+        self.compression = compression
+        self.schema = pa.schema([('day', pa.int64())] +
+                                [(name, pa.float64()) for name in COLUMNS[1:]])
+        self.writer = pq.ParquetWriter(path, self.schema, compression=compression or 'none')
+
+    def write_batch(self, batch):
+        arrays = [self.pa.array(batch[name], type=field.type)
+                  for name, field in zip(COLUMNS, self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+SINKS = {
+    'csv': CSVSink,
+    'jsonl': JSONLinesSink,
+    'parquet': ParquetSink
+}
+COMPRESSIONS = {'.gz': 'gzip', '.zst': 'zstd'}
+
+
+def open_sink(path, fmt=None, compression=None):
+    """Crear el destino según la extensión: .csv, .jsonl o .parquet (+ .gz/.zst)"""
+    name = path.lower()
+    for suffix, kind in COMPRESSIONS.items():
+        if name.endswith(suffix):
+            compression = compression or kind
+            name = name[:-len(suffix)]
+    if fmt is None:
+        fmt = name.rsplit('.', 1)[-1]
+        fmt = 'jsonl' if fmt in ('json', 'ndjson') else fmt
+    if fmt not in SINKS:
+        raise ValueError(f"Formato de exportación desconocido: {fmt}")
+    if fmt == 'parquet':
+        return ParquetSink(path, compression=compression or 'snappy')
+    return SINKS[fmt](path, compression)
+
+
+class HistoryExporter:
+    """Observador del motor que exporta las filas nuevas a medida que aparecen.
+
+    Las filas se escriben en bloques de ``flush_size``; ``close`` escribe el
+    resto. Si el historial retrocede (por ejemplo, al reiniciar el motor o al
+    saltar a un punto de control anterior), la exportación continúa desde ese
+    día en un archivo nuevo (``ruta.1``, ...); ``paths`` lista las partes.
+
+    Como observador nunca lanza excepciones: si falla la escritura, se
+    desconecta del motor y guarda el error en ``error``.
+    """
+
+    def __init__(self, engine, sink, flush_size=DEFAULT_FLUSH_SIZE, start=0):
+        self.engine = engine
+        self.sink = sink
+        self.paths = [sink.path]
+        self.error = None
+        self.flush_size = flush_size
+        self.exported = start
+        # Día de la fila 0 del historial con el que se exportó (las filas son días consecutivos)
+        self.first_day = engine.history.buffers['day'][0] if len(engine.history) else None
+        self.rows_written = 0
+        engine.add_observer(self)
+        self(engine)
+
+    def __call__(self, engine):
+        history = engine.history
+        try:
+            self.check_rollback(history)
+            # Sólo bloques completos; el resto espera a la siguiente notificación
+            end = self.exported + (len(history) - self.exported) // self.flush_size * self.flush_size
+            self.write(self.exported, end)
+        except OSError as error:
+            self.error = error
+            engine.remove_observer(self)
+
+    def check_rollback(self, history):
+        """Empezar una parte nueva si el historial ya no contiene las filas exportadas"""
+        if not self.exported:
+            return
+        days = history.buffers['day']
+        keep = min(self.exported, len(history))
+        if keep and days[keep - 1] != self.first_day + keep - 1:
+            # Se recortó y volvió a crecer entre dos notificaciones: las filas
+            # exportadas siguen presentes hasta la primera con otro día
+            # (``day - índice`` no decrece, así que se busca por bisección)
+            low, high = 0, keep
+            while low < high:
+                middle = (low + high) // 2
+                if days[middle] - middle == self.first_day:
+                    low = middle + 1
+                else:
+                    high = middle
+            keep = low
+        if keep < self.exported:
+            # Las filas siguientes reemplazan a las escritas desde este día
+            day = history.buffers['day'][keep] if keep < len(history) else self.engine.day
+            if day < self.first_day + self.exported:  # Un salto hacia adelante no repite filas
+                self.start_part()
+            self.exported = keep
+
+    def start_part(self):
+        """Cerrar el archivo actual y seguir exportando en ``ruta.N``"""
+        sink = self.sink
+        sink.close()
+        path = f"{self.paths[0]}.{len(self.paths)}"
+        self.sink = type(sink)(path, sink.compression)
+        self.paths.append(path)
+
+    def write(self, start, end):
+        if start == 0 and end > 0:
+            self.first_day = self.engine.history.buffers['day'][0]
+        for batch in iter_batches(self.engine.history, start, end, self.flush_size):
+            self.sink.write_batch(batch)
+            self.rows_written += len(batch['day'])
+        self.exported = max(self.exported, end)
+
+    def close(self):
+        self.engine.remove_observer(self)
+        try:
+            if self.error is None:
+                self.check_rollback(self.engine.history)
+                self.write(self.exported, len(self.engine.history))
+        finally:
+            self.sink.close()
+
+
+def export_headless(path, days, params=None, flush_size=DEFAULT_FLUSH_SIZE, engine=None):
+    """Simular ``days`` días sin interfaz exportando con memoria acotada"""
+    engine = engine or EcosystemEngine(params)
+    sink = open_sink(path)
+    try:
+        for batch in simulate_batches(engine, days, flush_size):
+            sink.write_batch(batch)
+    finally:
+        sink.close()
+    return engine
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exportar una simulación sin interfaz")
+    parser.add_argument("out", help="Archivo de salida: .csv, .jsonl o .parquet (+ .gz/.zst)")
+    parser.add_argument("--days", type=int, default=1000, help="Días a simular")
+    parser.add_argument("--flush-size", type=int, default=DEFAULT_FLUSH_SIZE,
+                        help="Filas por bloque escrito")
+    args = parser.parse_args(argv)
+
+    engine = export_headless(args.out, args.days, flush_size=args.flush_size)
+    print(f"{args.days} días exportados a {args.out} (día final {engine.day})")
+
+
+if __name__ == "__main__":
+    main()
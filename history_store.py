@@ -0,0 +1,220 @@
+"""Historial columnar con buffers contiguos tipados.
+
+Sustituye al diccionario de listas de ``reset_simulation``: cada columna
+es un ``array`` de C (8 bytes por muestra) con crecimiento geométrico, y
+las lecturas devuelven vistas ``memoryview`` sin copia.
+
+También mantiene agregados incrementales (máximo, mínimo, suma, cantidad y
+último valor) por columna y máximos/mínimos en ventana deslizante, para que
+los gráficos no recorran todo el historial en cada redibujado.
+"""
+
+from array import array
+from collections import deque
+
+from decimation import MinMaxPyramid
+
+# Columnas del historial y su tipo en C
+COLUMNS = (
+    ('day', 'q'),
+    ('foxes', 'd'),
+    ('rabbits', 'd'),
+    ('carrots', 'd'),
+)
+
+MIN_CAPACITY = 1024
+
+
+class RunningStats:
+    __slots__ = ('count', 'total', 'minimum', 'maximum', 'last')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.last = None
+
+    def update(self, values):
+        if not values:
+            return
+        self.merge(len(values), sum(values), min(values), max(values), values[-1])
+
+    def merge(self, count, total, low, high, last):
+        """Plegar los agregados ya calculados de un bloque de ``count`` valores"""
+        if self.count == 0:
+            self.minimum, self.maximum = low, high
+        else:
+            self.minimum = min(self.minimum, low)
+            self.maximum = max(self.maximum, high)
+        self.count += count
+        self.total += total
+        self.last = last
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+
+class MonotonicWindow:
+    """Máximo (o mínimo) de los últimos ``size`` valores con una cola monótona"""
+
+    def __init__(self, size, largest=True):
+        self.size = size
+        self.largest = largest
+        self.queue = deque()
+        self.next_index = 0
+
+    def push(self, value):
+        index = self.next_index
+        queue = self.queue
+        if self.largest:
+            while queue and queue[-1][1] <= value:
+                queue.pop()
+        else:
+            while queue and queue[-1][1] >= value:
+                queue.pop()
+        queue.append((index, value))
+        while queue[0][0] <= index - self.size:
+            queue.popleft()
+        self.next_index = index + 1
+
+    def reset(self, start=0):
+        self.queue.clear()
+        self.next_index = start
+
+    @property
+    def value(self):
+        return self.queue[0][1] if self.queue else None
+
+
+class HistoryStore:
+    def __init__(self, capacity=MIN_CAPACITY):
+        self.length = 0
+        self.capacity = 0
+        self.buffers = {}
+        self._allocate(max(capacity, MIN_CAPACITY))
+
+        # Agregados: se pliegan de forma incremental las muestras nuevas
+        self.aggregated = 0
+        self.running = {name: RunningStats() for name, _ in COLUMNS}
+        self.windows = {}
+        self.pyramids = {}
+
+    def _allocate(self, capacity):
+        # Se crean buffers nuevos en lugar de redimensionar los existentes, así
+        # las vistas que aún tenga la interfaz siguen siendo válidas.
+        new_buffers = {}
+        for name, typecode in COLUMNS:
+            buf = array(typecode, bytes(capacity * array(typecode).itemsize))
+            old = self.buffers.get(name)
+            if old is not None and self.length:
+                buf[:self.length] = old[:self.length]
+            new_buffers[name] = buf
+        self.buffers = new_buffers
+        self.capacity = capacity
+
+    def reserve(self, extra):
+        """Garantizar espacio para ``extra`` muestras más (crecimiento geométrico)"""
+        needed = self.length + extra
+        if needed > self.capacity:
+            capacity = self.capacity
+            while capacity < needed:
+                capacity *= 2
+            self._allocate(capacity)
+
+    def append(self, day, foxes, rabbits, carrots):
+        if self.length == self.capacity:
+            self.reserve(1)
+        i = self.length
+        b = self.buffers
+        b['day'][i] = day
+        b['foxes'][i] = foxes
+        b['rabbits'][i] = rabbits
+        b['carrots'][i] = carrots
+        self.length = i + 1
+
+    def extend(self, rows):
+        """Añadir un bloque de filas ``{columna: array}`` de una sola vez"""
+        count = len(rows['day'])
+        self.reserve(count)
+        start, end = self.length, self.length + count
+        for name, buf in self.buffers.items():
+            buf[start:end] = rows[name]
+        self.length = end
+
+    def rows(self, start=0, end=None):
+        """Copia de las filas ``[start, end)`` como ``{columna: array}``"""
+        end = self.length if end is None else end
+        return {name: buf[start:end] for name, buf in self.buffers.items()}
+
+    def clear(self):
+        self.truncate(0)
+
+    def truncate(self, length):
+        """Descartar las muestras desde ``length`` (los agregados se recalculan)"""
+        self.length = min(length, self.length)
+        self.aggregated = 0
+        self.running = {name: RunningStats() for name, _ in COLUMNS}
+        for window in self.windows.values():
+            window.reset()
+        for pyramid in self.pyramids.values():
+            pyramid.truncate(self.length)
+
+    def stats(self, name):
+        """Agregados acumulados de una columna, actualizados sólo con lo nuevo"""
+        if self.aggregated < self.length:
+            start, end = self.aggregated, self.length
+            for column, running in self.running.items():
+                running.update(self.buffers[column][start:end])
+            self.aggregated = end
+        return self.running[name]
+
+    def window(self, name, size, largest=True):
+        """Máximo (o mínimo) de los últimos ``size`` valores de una columna"""
+        key = (name, size, largest)
+        window = self.windows.get(key)
+        if window is None:
+            window = self.windows[key] = MonotonicWindow(size, largest)
+
+        # Sólo hace falta alimentar las muestras que caen dentro de la ventana
+        start = max(window.next_index, self.length - size)
+        if start > window.next_index:
+            window.reset(start)
+        buf = self.buffers[name]
+        for i in range(start, self.length):
+            window.push(buf[i])
+        return window.value
+
+    def pyramid(self, name):
+        pyramid = self.pyramids.get(name)
+        if pyramid is None:
+            pyramid = self.pyramids[name] = MinMaxPyramid(self, name)
+        return pyramid
+
+    def decimated(self, name, pixels, start=0, end=None):
+        """Índices de la columna en ``[start, end)`` reducidos a uno o dos puntos por píxel"""
+        end = self.length if end is None else end
+        return self.pyramid(name).window(start, end, pixels)
+
+    def summary(self, name, start=0, end=None):
+        """(mínimo, máximo, media) de la columna en ``[start, end)`` sin recorrerla"""
+        end = self.length if end is None else end
+        return self.pyramid(name).summary(start, end)
+
+    def __len__(self):
+        return self.length
+
+    def __contains__(self, name):
+        return name in self.buffers
+
+    def __getitem__(self, name):
+        """Vista sin copia de la columna con las muestras registradas"""
+        return memoryview(self.buffers[name])[:self.length]
+
+    def keys(self):
+        return [name for name, _ in COLUMNS]
+
+    @property
+    def nbytes(self):
+        return sum(buf.itemsize * self.capacity for buf in self.buffers.values())
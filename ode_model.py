@@ -0,0 +1,207 @@
+"""Modelo continuo del ecosistema integrado con Dormand-Prince (RK45) adaptativo.
+
+Es la versión en tiempo continuo de las mismas interacciones de
+``EcosystemEngine``: las cantidades diarias pasan a ser tasas por día. El
+integrador da pasos largos en las fases tranquilas y cortos cerca de los
+colapsos, y la salida se remuestrea en la malla diaria que esperan el
+historial y los gráficos.
+"""
+
+import math
+
+from ecosystem_engine import EcosystemEngine
+
+# Paso mínimo: por debajo se acepta el paso aunque supere la tolerancia
+MIN_STEP = 1e-9
+
+# Tabla de Butcher de Dormand-Prince 5(4)
+C2, C3, C4, C5 = 1 / 5, 3 / 10, 4 / 5, 8 / 9
+A21 = 1 / 5
+A31, A32 = 3 / 40, 9 / 40
+A41, A42, A43 = 44 / 45, -56 / 15, 32 / 9
+A51, A52, A53, A54 = 19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729
+A61, A62, A63, A64, A65 = 9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656
+B1, B3, B4, B5, B6 = 35 / 384, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84
+# Diferencia entre la solución de orden 5 y la de orden 4
+E1, E3, E4, E5, E6, E7 = (71 / 57600, -71 / 16695, 71 / 1920,
+                          -17253 / 339200, 22 / 525, -1 / 40)
+
+
+def derivatives(foxes, rabbits, carrots, params):
+    """Tasas de cambio por día de zorros, conejos y zanahorias"""
+    fox_death = foxes * params['fox_death_rate']
+    rabbits_eaten = min(rabbits, foxes * params['rabbits_per_fox_per_day'])
+    carrots_eaten = min(carrots, rabbits * params['carrots_per_rabbit_per_day'])
+
+    d_foxes = -fox_death + max(0, rabbits_eaten - fox_death) * 0.1
+    d_rabbits = (-rabbits_eaten + rabbits * params['rabbit_birth_rate'] -
+                 rabbits * params['rabbit_death_rate'])
+    d_carrots = -carrots_eaten + carrots * (params['carrot_growth_rate'] / 100)
+
+    # Las zanahorias no crecen por encima del máximo
+    if carrots >= params['max_carrots'] and d_carrots > 0:
+        d_carrots = 0.0
+    return d_foxes, d_rabbits, d_carrots
+
+
+def clamp(y, params):
+    foxes, rabbits, carrots = y
+    return (max(0.0, foxes), max(0.0, rabbits),
+            min(max(0.0, carrots), params['max_carrots']))
+
+
+def hermite(t0, y0, f0, t1, y1, f1, t):
+    """Interpolación cúbica de Hermite dentro de un paso aceptado"""
+    h = t1 - t0
+    s = (t - t0) / h
+    h00 = (1 + 2 * s) * (1 - s) ** 2
+    h10 = s * (1 - s) ** 2
+    h01 = s * s * (3 - 2 * s)
+    h11 = s * s * (s - 1)
+    return tuple(h00 * a + h10 * h * da + h01 * b + h11 * h * db
+                 for a, da, b, db in zip(y0, f0, y1, f1))
+
+
+class ContinuousEcosystemEngine(EcosystemEngine):
+    def __init__(self, params=None, rtol=1e-6, atol=1e-9, max_step=None):
+        self.rtol = rtol
+        self.atol = atol
+        self.max_step = max_step
+        super().__init__(params)
+
+    def reset(self):
+        self.step_size = 0.1
+        self.nfev = 0
+        self.steps = 0
+        self.rejected = 0
+        super().reset()
+
+    def get_state(self):
+        state = super().get_state()
+        state.update(step_size=self.step_size, nfev=self.nfev, steps=self.steps,
+                     rejected=self.rejected)
+        return state
+
+    def set_state(self, state):
+        self.step_size = state['step_size']
+        self.nfev, self.steps, self.rejected = state['nfev'], state['steps'], state['rejected']
+        super().set_state(state)
+
+    def f(self, y):
+        self.nfev += 1
+        return derivatives(y[0], y[1], y[2], self.params)
+
+    def run(self, days, notify=True):
+        """Integrar ``days`` días y guardar el estado al inicio de cada día.
+
+        El último paso se recorta para terminar justo en el día final, así que
+        el estado que queda es el de ese instante y varias corridas cortas
+        siguen la misma trayectoria que una larga (dentro de la tolerancia).
+        """
+        params = self.params
+        history = self.history
+        history.reserve(days)
+        h_day = history.buffers['day']
+        h_foxes = history.buffers['foxes']
+        h_rabbits = history.buffers['rabbits']
+        h_carrots = history.buffers['carrots']
+        i = history.length
+
+        t = float(self.day)
+        t_end = t + days
+        end_output = self.day + days
+        y = (self.foxes, self.rabbits, self.carrots)
+        f0 = self.f(y)
+        h = self.step_size
+        next_output = self.day
+
+        while True:
+            # Volcar los días que ya cubre el paso actual
+            while next_output <= t and next_output < end_output:
+                h_day[i] = next_output
+                h_foxes[i], h_rabbits[i], h_carrots[i] = y
+                i += 1
+                next_output += 1
+            if t >= t_end:
+                break
+
+            if self.max_step:
+                h = min(h, self.max_step)
+            # El último paso se recorta para terminar exactamente en t_end
+            last = h >= t_end - t
+            if last:
+                h = t_end - t
+
+            y1, f1, error = self.dopri_step(y, f0, h)
+            if error <= 1.0 or h <= MIN_STEP:
+                # Paso aceptado: remuestrear en los días enteros que cruza
+                t1 = t_end if last else t + h
+                clamped = clamp(y1, params)
+                if clamped != y1:
+                    # El recorte cambió el estado: la derivada final ya no sirve
+                    y1 = clamped
+                    f1 = self.f(y1)
+                stationary = y1 == y
+                while next_output < t1 and next_output < end_output:
+                    if stationary:
+                        state = y
+                    else:
+                        state = clamp(hermite(t, y, f0, t1, y1, f1, next_output), params)
+                    h_day[i] = next_output
+                    h_foxes[i], h_rabbits[i], h_carrots[i] = state
+                    i += 1
+                    next_output += 1
+                t, y, f0 = t1, y1, f1
+                self.steps += 1
+
+                if not all(math.isfinite(value) for value in y):
+                    # La población diverge: el resto de los días queda en ese estado
+                    while next_output < end_output:
+                        h_day[i] = next_output
+                        h_foxes[i], h_rabbits[i], h_carrots[i] = y
+                        i += 1
+                        next_output += 1
+                    break
+            else:
+                self.rejected += 1
+
+            # Control del tamaño de paso
+            if not math.isfinite(error):
+                factor = 0.2
+            elif error == 0:
+                factor = 5.0
+            else:
+                factor = min(5.0, max(0.2, 0.9 * error ** -0.2))
+            h *= factor
+
+        history.length = i
+        self.step_size = h
+        self.day += days
+        self.foxes, self.rabbits, self.carrots = y
+
+        if notify:
+            self.notify()
+
+    def dopri_step(self, y, k1, h):
+        f = self.f
+        rtol, atol = self.rtol, self.atol
+
+        def add(*terms):
+            return tuple(y[j] + h * sum(c * k[j] for c, k in terms) for j in range(3))
+
+        k2 = f(add((A21, k1)))
+        k3 = f(add((A31, k1), (A32, k2)))
+        k4 = f(add((A41, k1), (A42, k2), (A43, k3)))
+        k5 = f(add((A51, k1), (A52, k2), (A53, k3), (A54, k4)))
+        k6 = f(add((A61, k1), (A62, k2), (A63, k3), (A64, k4), (A65, k5)))
+        y1 = add((B1, k1), (B3, k3), (B4, k4), (B5, k5), (B6, k6))
+        k7 = f(y1)
+
+        # Norma RMS del error local escalado por las tolerancias
+        total = 0.0
+        for j in range(3):
+            err = h * (E1 * k1[j] + E3 * k3[j] + E4 * k4[j] +
+                       E5 * k5[j] + E6 * k6[j] + E7 * k7[j])
+            scale = atol + rtol * max(abs(y[j]), abs(y1[j]))
+            total += (err / scale) ** 2
+        return y1, k7, (total / 3) ** 0.5
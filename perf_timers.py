@@ -0,0 +1,109 @@
+"""Temporizadores por fase y perfilado bajo demanda para la interfaz.
+
+``PhaseTimer`` mide cuánto tarda cada etapa de ``update_display`` y
+``run_simulation`` con ``time.perf_counter``; apagado, el costo es una sola
+comprobación de ``enabled`` por cuadro. Además lleva los cuadros por segundo
+y los días simulados por segundo del último segundo.
+
+``Profiler`` envuelve ``cProfile``: la primera llamada a ``toggle`` empieza a
+perfilar y la segunda guarda las estadísticas en un archivo ``.prof``.
+"""
+
+import cProfile
+import io
+import pstats
+import time
+from collections import deque
+
+# Muestras por fase para el promedio móvil
+WINDOW = 30
+
+
+class PhaseTimer:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = {}
+        self.frames = deque()
+        self.last = 0.0
+        self.items = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.phases.clear()
+        self.frames.clear()
+        return self.enabled
+
+    def start(self):
+        self.last = time.perf_counter()
+
+    def lap(self, name):
+        """Registrar el tiempo desde ``start`` o el ``lap`` anterior como fase ``name``"""
+        now = time.perf_counter()
+        samples = self.phases.get(name)
+        if samples is None:
+            samples = self.phases[name] = deque(maxlen=WINDOW)
+        samples.append(now - self.last)
+        self.last = now
+
+    def frame(self, day, items):
+        """Marcar un cuadro dibujado con el día actual y los elementos del canvas"""
+        now = time.perf_counter()
+        frames = self.frames
+        frames.append((now, day))
+        while len(frames) > 2 and now - frames[0][0] > 1.0:
+            frames.popleft()
+        self.items = items
+
+    @property
+    def fps(self):
+        if len(self.frames) < 2:
+            return 0.0
+        elapsed = self.frames[-1][0] - self.frames[0][0]
+        return (len(self.frames) - 1) / elapsed if elapsed else 0.0
+
+    @property
+    def days_per_sec(self):
+        if len(self.frames) < 2:
+            return 0.0
+        (t0, day0), (t1, day1) = self.frames[0], self.frames[-1]
+        return (day1 - day0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def phase_ms(self, name):
+        samples = self.phases.get(name)
+        return sum(samples) / len(samples) * 1000 if samples else 0.0
+
+    def summary(self):
+        """Texto de dos líneas para el panel superpuesto"""
+        phases = " | ".join(f"{name} {self.phase_ms(name):.2f} ms" for name in self.phases)
+        return (f"FPS {self.fps:.1f} | {self.days_per_sec:,.0f} días/s | "
+                f"{self.items} elementos\n{phases}")
+
+
+class Profiler:
+    def __init__(self):
+        self.profile = None
+        self.last_report = ""
+
+    @property
+    def running(self):
+        return self.profile is not None
+
+    def toggle(self, path=None):
+        """Empezar a perfilar, o detenerse y guardar; devuelve la ruta al guardar"""
+        if self.profile is None:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+            return None
+
+        self.profile.disable()
+        path = path or time.strftime("perfil-%Y%m%d-%H%M%S.prof")
+        self.profile.dump_stats(path)
+        self.last_report = self.report()
+        self.profile = None
+        return path
+
+    def report(self, limit=20):
+        """Las ``limit`` funciones con más tiempo acumulado"""
+        output = io.StringIO()
+        pstats.Stats(self.profile, stream=output).sort_stats("cumulative").print_stats(limit)
+        return output.getvalue()
@@ -0,0 +1,660 @@
+"""Dibujo de los gráficos en un búfer de píxeles, sin Tk.
+
+``RasterRenderer`` reproduce la disposición y los colores de
+``draw_line_graph``, ``draw_bar_graph`` y ``draw_pie_chart`` sobre un arreglo
+de NumPy ``(alto, ancho, 3)``. Sirve para:
+
+* generar imágenes en servidores sin pantalla (``encode_png``,
+  ``write_frames``);
+* mostrar el gráfico en la interfaz como una sola ``PhotoImage`` por cuadro
+  (``to_ppm``) en lugar de cientos de elementos del canvas.
+
+Los textos se dibujan con Pillow si está instalado; si no, sólo los que
+tienen únicamente cifras (ejes, días, porcentajes) con una fuente de mapa de
+bits propia. Las líneas no se suavizan como con ``smooth=True`` del canvas.
+El PNG se escribe sólo con ``zlib``.
+
+Secuencia de cuadros de una corrida larga (para armar un video)::
+
+    python raster_renderer.py --days 100000 --frames 600 --graph line --output cuadros/
+"""
+
+import argparse
+import math
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from ecosystem_engine import EcosystemEngine
+
+GRAPHS = ("line", "bar", "pie")
+
+# Mismos colores y medidas que los gráficos del canvas
+PADDING = 80
+BAR_DAYS = 20
+SERIES = (('carrots', "#fb923c", "#fed7aa"),
+          ('rabbits', "#6b7280", "#d1d5db"),
+          ('foxes', "#f97316", "#fed7aa"))
+PIE_SEGMENTS = (('foxes', "#f97316", "#ea580c", "🦊 Zorros"),
+                ('rabbits', "#6b7280", "#4b5563", "🐰 Conejos"),
+                ('carrots', "#fb923c", "#ea580c", "🥕 Zanahorias"))
+BAR_COLORS = {'carrots': ("#fb923c", "#ea580c"),
+              'rabbits': ("#6b7280", "#4b5563"),
+              'foxes': ("#f97316", "#ea580c")}
+
+# Fuente de 3x5 píxeles para los textos numéricos cuando no hay Pillow
+GLYPHS = {
+    '0': ("111", "101", "101", "101", "111"),
+    '1': ("010", "110", "010", "010", "111"),
+    '2': ("111", "001", "111", "100", "111"),
+    '3': ("111", "001", "111", "001", "111"),
+    '4': ("101", "101", "111", "001", "001"),
+    '5': ("111", "100", "111", "001", "111"),
+    '6': ("111", "100", "111", "101", "111"),
+    '7': ("111", "001", "001", "001", "001"),
+    '8': ("111", "101", "111", "101", "111"),
+    '9': ("111", "101", "111", "001", "111"),
+    '.': ("000", "000", "000", "000", "010"),
+    ',': ("000", "000", "000", "010", "100"),
+    '%': ("101", "001", "010", "100", "101"),
+    '-': ("000", "000", "111", "000", "000"),
+    '(': ("010", "100", "100", "100", "010"),
+    ')': ("010", "001", "001", "001", "010"),
+    'D': ("110", "101", "101", "101", "110"),
+    ' ': ("000", "000", "000", "000", "000"),
+}
+GLYPH_MASKS = {char: np.array([[c == '1' for c in row] for row in rows])
+               for char, rows in GLYPHS.items()}
+
+_colors = {}
+
+
+def packed(color):
+    """``"#rrggbb"`` como un píxel de 32 bits (R, G, B, relleno en memoria)"""
+    value = _colors.get(color)
+    if value is None:
+        r, g, b = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+        value = _colors[color] = np.array([r, g, b, 255], dtype=np.uint8).view(np.uint32)[0]
+    return value
+
+
+def to_ppm(pixels):
+    """Imagen PPM binaria, el formato que ``tk.PhotoImage`` lee sin decodificar"""
+    height, width, _ = pixels.shape
+    return b"P6 %d %d 255\n" % (width, height) + pixels.tobytes()
+
+
+def encode_png(pixels, level=1):
+    """PNG RGB de 8 bits; ``level`` es la compresión de zlib (1 = la más rápida)"""
+    height, width, _ = pixels.shape
+    raw = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 0] = 0  # Sin filtro en cada fila
+    raw[:, 1:] = pixels.reshape(height, width * 3)
+
+    def chunk(tag, data):
+        return (struct.pack('>I', len(data)) + tag + data +
+                struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+    return (b"\x89PNG\r\n\x1a\n" +
+            chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(raw.tobytes(), level)) +
+            chunk(b'IEND', b''))
+
+
+def save_png(pixels, path, level=1):
+    with open(path, 'wb') as f:
+        f.write(encode_png(pixels, level))
+
+
+def take(column, indices):
+    """Valores de una columna del historial (memoryview o ``range``) en ``indices``"""
+    if isinstance(column, range):
+        return (column.start + column.step * indices).astype(np.float64)
+    return np.asarray(column)[indices].astype(np.float64)
+
+
+class Raster:
+    """Búfer de píxeles con las primitivas que usan los gráficos (coordenadas como en Tk).
+
+    Mientras se dibuja, cada píxel es un entero de 32 bits, así que pintar
+    una máscara es una sola asignación; ``finish`` lo pasa a RGB.
+    """
+
+    def __init__(self, width, height, background="#ffffff"):
+        self.width = width
+        self.height = height
+        self.blank = np.full((height, width), packed(background), dtype=np.uint32)
+        self.buffer = self.blank.copy()
+        self.pixels = np.empty((height, width, 3), dtype=np.uint8)
+        self.texts = []
+        # Geometría de los círculos por (centro, radio): se repite en cada cuadro
+        self.disks = {}
+
+    def clear(self):
+        np.copyto(self.buffer, self.blank)
+        self.texts = []
+
+    def _clip_box(self, x1, y1, x2, y2):
+        x1, x2 = sorted((x1, x2))
+        y1, y2 = sorted((y1, y2))
+        return (max(0, int(round(x1))), max(0, int(round(y1))),
+                min(self.width, int(round(x2))), min(self.height, int(round(y2))))
+
+    def rectangle(self, x1, y1, x2, y2, fill=None, outline=None, width=1):
+        if fill:
+            bx1, by1, bx2, by2 = self._clip_box(x1, y1, x2, y2)
+            if bx2 > bx1 and by2 > by1:
+                self.buffer[by1:by2, bx1:bx2] = packed(fill)
+        if outline:
+            # El borde de Tk queda centrado sobre el contorno
+            half = width / 2
+            for box in ((x1 - half, y1 - half, x2 + half, y1 + half),
+                        (x1 - half, y2 - half, x2 + half, y2 + half),
+                        (x1 - half, y1 - half, x1 + half, y2 + half),
+                        (x2 - half, y1 - half, x2 + half, y2 + half)):
+                self.rectangle(*box, fill=outline)
+
+    def stripes(self, x1, y1, x2, y2, color, dark_color, period=6):
+        """Franjas horizontales alternas desde ``y1`` (el gradiente de las barras 3D)"""
+        bx1, by1, bx2, by2 = self._clip_box(x1, y1, x2, y2)
+        if bx2 <= bx1 or by2 <= by1:
+            return
+        rows = (np.arange(by1, by2) - int(round(min(y1, y2)))) // period % 2 == 1
+        region = self.buffer[by1:by2, bx1:bx2]
+        region[:] = packed(color)
+        region[rows] = packed(dark_color)
+
+    def dashed_hline(self, x1, x2, y, color, width=1, dash=(2, 4)):
+        bx1, by1, bx2, by2 = self._clip_box(x1, y - width / 2, x2, y + width / 2)
+        if bx2 <= bx1 or by2 <= by1:
+            return
+        on = (np.arange(bx1, bx2) - bx1) % sum(dash) < dash[0]
+        self.buffer[by1:by2, bx1:bx2][:, on] = packed(color)
+
+    def _stamp(self, xs, ys, radius, color):
+        """Pintar un disco de radio ``radius`` en cada punto (sin repetir centros)"""
+        if not len(xs):
+            return
+        r = int(math.ceil(radius))
+        pad = r + 1
+        stride = self.width + 2 * pad
+        cx = np.clip(np.rint(xs).astype(np.int64), -pad, self.width + r) + pad
+        cy = np.clip(np.rint(ys).astype(np.int64), -pad, self.height + r) + pad
+        cy, cx = np.divmod(np.unique(cy * stride + cx), stride)
+        cx -= pad
+        cy -= pad
+        oy, ox = np.mgrid[-r:r + 1, -r:r + 1]
+        inside = ox * ox + oy * oy <= radius * radius + 0.25
+        px = (cx[:, None] + ox[inside][None, :]).ravel()
+        py = (cy[:, None] + oy[inside][None, :]).ravel()
+        valid = (px >= 0) & (px < self.width) & (py >= 0) & (py < self.height)
+        self.buffer[py[valid], px[valid]] = packed(color)
+
+    def line(self, points, fill, width=1):
+        """Polilínea gruesa: se muestrea cada segmento a un punto por píxel"""
+        xs = np.asarray(points[0::2], dtype=float)
+        ys = np.asarray(points[1::2], dtype=float)
+        if len(xs) < 2:
+            return
+        dx, dy = np.diff(xs), np.diff(ys)
+        steps = np.maximum(1, np.ceil(np.hypot(dx, dy))).astype(np.int64)
+        segment = np.repeat(np.arange(len(steps)), steps)
+        offset = np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)
+        t = offset / steps[segment]
+        sx = np.append(xs[segment] + dx[segment] * t, xs[-1])
+        sy = np.append(ys[segment] + dy[segment] * t, ys[-1])
+        self._stamp(sx, sy, max(0.5, width / 2), fill)
+
+    def fill_between(self, xs, top, bottom, fill, alpha=1.0):
+        """Rellenar cada columna entre dos curvas (``xs`` creciente), como los
+        polígonos de área y de bandas del gráfico de líneas"""
+        xs = np.asarray(xs, dtype=float)
+        if len(xs) < 2:
+            return
+        c1 = max(0, int(math.ceil(xs[0])))
+        c2 = min(self.width, int(math.floor(xs[-1])) + 1)
+        if c2 <= c1:
+            return
+        columns = np.arange(c1, c2)
+        upper = np.interp(columns, xs, np.asarray(top, dtype=float))
+        lower = np.interp(columns, xs, np.asarray(bottom, dtype=float))
+        y1 = max(0, int(math.floor(upper.min())))
+        y2 = min(self.height, int(math.ceil(lower.max())) + 1)
+        if y2 <= y1:
+            return
+        rows = np.arange(y1, y2)[:, None]
+        mask = (rows >= upper[None, :]) & (rows <= lower[None, :])
+        region = self.buffer[y1:y2, c1:c2]
+        if alpha >= 1:
+            region[mask] = packed(fill)
+        else:
+            channels = region.view(np.uint8).reshape(region.shape + (4,))
+            color = np.frombuffer(packed(fill).tobytes(), dtype=np.uint8)
+            selected = channels[mask]
+            channels[mask] = (selected * (1 - alpha) + color * alpha).astype(np.uint8)
+
+    def disk(self, cx, cy, radius):
+        """Recorte que contiene el círculo y su geometría (coordenadas relativas
+        al centro, distancia y ángulo), guardada para los cuadros siguientes"""
+        key = (cx, cy, radius)
+        geometry = self.disks.get(key)
+        if geometry is None:
+            x1, y1, x2, y2 = self._clip_box(cx - radius - 1, cy - radius - 1,
+                                            cx + radius + 2, cy + radius + 2)
+            dy, dx = np.mgrid[y1:y2, x1:x2].astype(np.float32)
+            dx += 0.5 - cx
+            dy += 0.5 - cy
+            geometry = self.disks[key] = {
+                'box': (slice(y1, y2), slice(x1, x2)), 'dx': dx, 'dy': dy,
+                'distance': np.hypot(dx, dy),
+                # Grados en sentido antihorario desde el eje X, como ``start`` de Tk
+                'angle': np.degrees(np.arctan2(-dy, dx)) % 360
+            }
+        return self.buffer[geometry['box']], geometry
+
+    def oval(self, x1, y1, x2, y2, fill=None, outline=None, width=1):
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        rx, ry = max(abs(x2 - x1) / 2, 0.5), max(abs(y2 - y1) / 2, 0.5)
+        if rx == ry:
+            # Círculo: la geometría se reutiliza entre cuadros
+            region, geometry = self.disk(cx, cy, rx + width)
+            distance = geometry['distance'] - rx
+        else:
+            bx1, by1, bx2, by2 = self._clip_box(cx - rx - width, cy - ry - width,
+                                                cx + rx + width + 1, cy + ry + width + 1)
+            if bx2 <= bx1 or by2 <= by1:
+                return
+            dy, dx = np.ogrid[by1:by2, bx1:bx2]
+            # Distancia aproximada al contorno de la elipse, en píxeles
+            distance = (np.sqrt(((dx + 0.5 - cx) / rx) ** 2 + ((dy + 0.5 - cy) / ry) ** 2) - 1) \
+                * min(rx, ry)
+            region = self.buffer[by1:by2, bx1:bx2]
+        if fill:
+            region[distance <= 0] = packed(fill)
+        if outline and width:
+            region[np.abs(distance) <= width / 2] = packed(outline)
+
+    def markers(self, xs, ys, radius, fill, outline, width):
+        """Muchos círculos iguales de una vez, cada uno encima de los anteriores"""
+        r = int(math.ceil(radius + width / 2))
+        oy, ox = np.mgrid[-r:r + 1, -r:r + 1]
+        distance = np.hypot(ox, oy) - radius
+        outline_mask = np.abs(distance) <= width / 2
+        keep = (distance <= 0) | outline_mask
+        colors = np.where(outline_mask[keep], packed(outline), packed(fill))
+
+        cx = np.rint(np.asarray(xs)).astype(np.int64)
+        cy = np.rint(np.asarray(ys)).astype(np.int64)
+        px = (cx[:, None] + ox[keep][None, :]).ravel()
+        py = (cy[:, None] + oy[keep][None, :]).ravel()
+        values = np.broadcast_to(colors, (len(cx), len(colors))).ravel()
+        valid = (px >= 0) & (px < self.width) & (py >= 0) & (py < self.height)
+        # Con índices repetidos gana la última asignación: el orden de dibujo se respeta
+        self.buffer[py[valid], px[valid]] = values[valid]
+
+    def pie(self, cx, cy, radius, slices, outline="#ffffff", width=4, inset=3):
+        """Porciones consecutivas ``(extensión, color, color oscuro)`` desde 0°.
+
+        Cada porción es un arco relleno con borde y, encima, el segmento entre
+        el arco y su cuerda (``style=tk.CHORD``) con radio ``radius - inset``
+        en el color oscuro. Se calcula qué porción y qué segmento queda
+        visible en cada píxel y se pinta todo de una vez.
+        """
+        slices = [piece for piece in slices if piece[0] > 0]
+        if not slices:
+            return
+        region, geometry = self.disk(cx, cy, radius + width)
+        distance, angle = geometry['distance'], geometry['angle']
+        extents = np.array([extent for extent, _, _ in slices])
+        ends = np.cumsum(extents)
+        starts = ends - extents
+
+        # Porción que cubre cada píxel
+        index = np.minimum(np.searchsorted(ends, angle, side='right'), len(slices) - 1)
+        # El segmento de una porción tapa lo dibujado antes, no las porciones siguientes
+        chord_radius = radius - inset
+        inside_chord = distance <= chord_radius
+        code = index.copy()
+        for i, (start, extent) in enumerate(zip(starts, extents)):
+            middle = math.radians(start + extent / 2)
+            along = geometry['dx'] * math.cos(middle) - geometry['dy'] * math.sin(middle)
+            mask = inside_chord & (along >= chord_radius * math.cos(math.radians(extent / 2)))
+            code[mask & (index <= i)] = len(slices) + i
+
+        palette = np.array([packed(fill) for _, fill, _ in slices] +
+                           [packed(dark) for _, _, dark in slices], dtype=np.uint32)
+        inside = distance <= radius
+        region[inside] = palette[code[inside]]
+
+        if outline and width:
+            region[np.abs(distance - radius) <= width / 2] = packed(outline)
+            if len(slices) > 1:
+                for edge in starts:
+                    a = math.radians(edge)
+                    self.line([cx, cy, cx + radius * math.cos(a), cy - radius * math.sin(a)],
+                              outline, width)
+
+    def text(self, x, y, text, fill, size=11, anchor="center", angle=0):
+        """Encolar un texto; se dibujan todos juntos en ``finish``"""
+        self.texts.append((x, y, text, fill, size, anchor, angle))
+
+    def finish(self):
+        """Pasar el búfer a RGB, dibujar los textos pendientes y devolver ``(alto, ancho, 3)``"""
+        if self.texts:
+            try:
+                import PIL  # noqa: F401 (sólo se comprueba si está instalado)
+            except ImportError:
+                for x, y, text, fill, size, anchor, angle in self.texts:
+                    if not angle:
+                        self.bitmap_text(x, y, text, fill, size, anchor)
+                self.texts, texts = [], []
+            else:
+                texts, self.texts = self.texts, []
+        else:
+            texts = []
+        channels = self.buffer.view(np.uint8).reshape(self.height, self.width, 4)
+        for channel in range(3):  # Canal por canal es varias veces más rápido
+            np.copyto(self.pixels[..., channel], channels[..., channel])
+        if texts:
+            draw_texts_pillow(self.pixels, texts)
+        return self.pixels
+
+    def bitmap_text(self, x, y, text, fill, size, anchor):
+        if not text or any(char not in GLYPH_MASKS for char in text):
+            return
+        scale = max(1, int(round(size / 6)))
+        mask = np.hstack([np.hstack([GLYPH_MASKS[char], np.zeros((5, 1), bool)])
+                          for char in text])[:, :-1]
+        mask = mask.repeat(scale, axis=0).repeat(scale, axis=1)
+        height, width = mask.shape
+        x1 = x - width / 2 if anchor in ("center", "n", "s") else x - width if "e" in anchor else x
+        y1 = y - height / 2 if anchor in ("center", "e", "w") else y - height if "s" in anchor else y
+        x1, y1 = int(round(x1)), int(round(y1))
+        bx1, by1, bx2, by2 = self._clip_box(x1, y1, x1 + width, y1 + height)
+        if bx2 <= bx1 or by2 <= by1:
+            return
+        mask = mask[by1 - y1:by2 - y1, bx1 - x1:bx2 - x1]
+        self.buffer[by1:by2, bx1:bx2][mask] = packed(fill)
+
+
+# Anclas de Tk a anclas de Pillow
+PILLOW_ANCHORS = {"center": "mm", "n": "mt", "s": "mb", "e": "rm", "w": "lm",
+                  "nw": "lt", "ne": "rt", "sw": "lb", "se": "rb"}
+_fonts = {}
+
+
+def pillow_font(size):
+    from PIL import ImageFont
+
+    font = _fonts.get(size)
+    if font is None:
+        # Los puntos de Tk son aproximadamente 4/3 píxeles
+        pixels = round(size * 4 / 3)
+        try:
+            font = ImageFont.truetype("DejaVuSans.ttf", pixels)
+        except OSError:
+            try:
+                font = ImageFont.load_default(size=pixels)
+            except TypeError:  # Pillow < 10.1: fuente de tamaño fijo
+                font = ImageFont.load_default()
+        _fonts[size] = font
+    return font
+
+
+def draw_texts_pillow(pixels, texts):
+    from PIL import Image, ImageDraw
+
+    image = Image.fromarray(pixels)
+    draw = ImageDraw.Draw(image)
+    for x, y, text, fill, size, anchor, angle in texts:
+        font = pillow_font(size)
+        # Las fuentes de texto no traen los emojis de las leyendas
+        text = "".join(char for char in text if char <= "\uffff").strip()
+        if not angle:
+            draw.text((x, y), text, fill=fill, font=font, anchor=PILLOW_ANCHORS[anchor])
+            continue
+        # Texto girado: se dibuja en una capa aparte y se pega centrado en (x, y)
+        left, top, right, bottom = draw.textbbox((0, 0), text, font=font, anchor="lt")
+        layer = Image.new("L", (right - left + 2, bottom - top + 2), 0)
+        ImageDraw.Draw(layer).text((1 - left, 1 - top), text, fill=255, font=font, anchor="lt")
+        layer = layer.rotate(angle, expand=True)
+        position = (int(x - layer.width / 2), int(y - layer.height / 2))
+        image.paste(Image.new("RGB", layer.size, fill), position, layer)
+    pixels[:] = np.asarray(image)
+
+
+class RasterRenderer:
+    """Los tres gráficos de la interfaz dibujados en un ``Raster``"""
+
+    def __init__(self, width, height):
+        self.raster = Raster(width, height)
+
+    @property
+    def size(self):
+        return self.raster.width, self.raster.height
+
+    def resize(self, width, height):
+        if (width, height) != self.size:
+            self.raster = Raster(width, height)
+
+    def render(self, graph, engine, bands=None, window=None):
+        """Dibujar ``graph`` ("line", "bar" o "pie") y devolver el arreglo de píxeles.
+
+        ``window`` = (inicio, fin) limita el gráfico de líneas a esos índices del historial.
+        """
+        self.raster.clear()
+        if graph == "line":
+            self.draw_line_graph(engine.history, bands, window)
+        elif graph == "bar":
+            self.draw_bar_graph(engine.history)
+        elif graph == "pie":
+            self.draw_pie_chart(engine.foxes, engine.rabbits, engine.carrots)
+        return self.raster.finish()
+
+    def draw_grid(self, max_value):
+        raster = self.raster
+        width, height = self.size
+        graph_height = height - 2 * PADDING
+        for i in range(5):
+            y = PADDING + (i * graph_height / 4)
+            raster.dashed_hline(PADDING, width - PADDING, y, "#e5e7eb", width=2)
+            raster.text(PADDING - 15, y, f"{max_value * (1 - i / 4):.0f}", "#6b7280", anchor="e")
+        raster.rectangle(PADDING - 2, height - PADDING - 2, width - PADDING, height - PADDING + 2,
+                         fill="#374151")
+        raster.rectangle(PADDING - 2, PADDING, PADDING + 2, height - PADDING, fill="#374151")
+
+    def draw_axis_titles(self):
+        width, height = self.size
+        self.raster.text(width // 2, height - 30, "Días", "#1f2937", size=14)
+        self.raster.text(30, height // 2, "Población", "#1f2937", size=14, angle=90)
+
+    def draw_line_graph(self, history, bands=None, window=None):
+        start, end = window or (0, len(history))
+        end = min(end, len(history))
+        if end - start < 2:
+            return
+        raster = self.raster
+        width, height = self.size
+        graph_width = width - 2 * PADDING
+        graph_height = height - 2 * PADDING
+
+        if window is None:
+            max_value = max(history.stats('foxes').maximum, history.stats('rabbits').maximum,
+                            history.stats('carrots').maximum, 1)
+        else:
+            max_value = max(max(history.summary(name, start, end)[1] for name, _, _ in SERIES), 1)
+        days = history['day']
+        first_day, last_day = days[start], days[end - 1]
+        band_start = max(0, first_day)
+        band_end = min(len(bands['day']), last_day + 1) if bands else 0
+        if band_end > band_start:
+            for name, _, _ in SERIES:
+                max_value = max(max_value, float(bands['bands'][name][-1][band_start:band_end].max()))
+        self.draw_grid(max_value)
+
+        baseline = height - PADDING
+        scale_x = graph_width / (last_day - first_day) if last_day > first_day else 0.0
+        lines = {}
+        for name, color, area_color in SERIES:
+            indices = np.asarray(history.decimated(name, graph_width, start, end), dtype=np.int64)
+            xs = PADDING + (take(days, indices) - first_day) * scale_x
+            ys = baseline - take(history[name], indices) / max_value * graph_height
+            raster.fill_between(xs, ys, np.full_like(ys, baseline), area_color)
+            lines[name] = (xs, ys)
+
+        for name, color, _ in SERIES:
+            if band_end - band_start < 2:
+                continue
+            low = np.asarray(bands['bands'][name][0][band_start:band_end], dtype=float)
+            high = np.asarray(bands['bands'][name][-1][band_start:band_end], dtype=float)
+            xs = PADDING + (np.arange(band_start, band_end) - first_day) * scale_x
+            raster.fill_between(xs, baseline - high / max_value * graph_height,
+                                baseline - low / max_value * graph_height, color, alpha=0.25)
+
+        for name, color, _ in SERIES:
+            xs, ys = lines[name]
+            raster.line(np.column_stack((xs, ys)).ravel(), color, width=5)
+
+        # Puntos destacados de los zorros (uno de cada dos puntos dibujados)
+        xs, ys = lines['foxes']
+        raster.markers(xs[::2], ys[::2], 6, "#f97316", "#ffffff", 2)
+        self.draw_axis_titles()
+
+    def draw_bar_graph(self, history):
+        if len(history) < 1:
+            return
+        raster = self.raster
+        width, height = self.size
+        graph_width = width - 2 * PADDING
+        graph_height = height - 2 * PADDING
+
+        days_to_show = min(BAR_DAYS, len(history))
+        start = len(history) - days_to_show
+        max_value = max(history.window('foxes', BAR_DAYS), history.window('rabbits', BAR_DAYS),
+                        history.window('carrots', BAR_DAYS), 1)
+        self.draw_grid(max_value)
+
+        bar_group_width = graph_width / days_to_show
+        bar_width = bar_group_width / 3.5
+        y2 = height - PADDING
+        for i in range(days_to_show):
+            x = PADDING + (i * bar_group_width) + bar_group_width / 2
+            for offset, name in ((-1.5, 'carrots'), (-0.5, 'rabbits'), (0.5, 'foxes')):
+                x1 = x + bar_width * offset
+                y1 = y2 - history[name][start + i] / max_value * graph_height
+                self.draw_3d_bar(x1, y1, x1 + bar_width, y2, *BAR_COLORS[name])
+            if i % 2 == 0:
+                raster.text(x, height - PADDING + 20, f"D{history['day'][start + i]}", "#6b7280",
+                            size=10)
+        self.draw_axis_titles()
+
+    def draw_3d_bar(self, x1, y1, x2, y2, color, dark_color):
+        raster = self.raster
+        raster.rectangle(x1 + 4, y1 + 4, x2 + 4, y2 + 4, fill="#d1d5db")
+        raster.stripes(x1, y1, x2, y2, color, dark_color)
+        raster.rectangle(x1, y1, x2, y2, outline="#ffffff", width=3)
+        raster.rectangle(x1, y1, x2, y1 + 6, fill="#f8fafc")
+
+    def draw_pie_chart(self, foxes, rabbits, carrots):
+        total = foxes + rabbits + carrots
+        if total == 0:
+            return
+        raster = self.raster
+        width, height = self.size
+        center_x, center_y = width // 2, height // 2
+        radius = min(width, height) // 2.5
+        values = {'foxes': foxes, 'rabbits': rabbits, 'carrots': carrots}
+
+        raster.text(center_x, 40, "Distribución Actual del Ecosistema", "#1f2937", size=18)
+        raster.oval(center_x - radius + 6, center_y - radius + 6,
+                    center_x + radius + 6, center_y + radius + 6, fill="#e5e7eb")
+
+        start_angle = 0
+        slices = []
+        labels = []
+        for name, color, dark_color, _ in PIE_SEGMENTS:
+            angle = values[name] / total * 360
+            if angle <= 0:
+                continue
+            slices.append((angle, color, dark_color))
+            middle = math.radians(start_angle + angle / 2)
+            labels.append((center_x + radius * 0.7 * math.cos(middle),
+                           center_y - radius * 0.7 * math.sin(middle), color,
+                           values[name] / total * 100))
+            start_angle += angle
+        raster.pie(center_x, center_y, radius, slices)
+
+        for label_x, label_y, color, percentage in labels:
+            raster.oval(label_x - 35, label_y - 25, label_x + 35, label_y + 25,
+                        fill="#ffffff", outline=color, width=3)
+            raster.text(label_x, label_y, f"{percentage:.1f}%", color, size=12)
+
+        inner_radius = radius * 0.4
+        raster.oval(center_x - inner_radius, center_y - inner_radius,
+                    center_x + inner_radius, center_y + inner_radius,
+                    fill="#ffffff", outline="#e5e7eb", width=3)
+        raster.text(center_x, center_y - 12, "Total", "#6b7280", size=14)
+        raster.text(center_x, center_y + 18, f"{int(total)}", "#1f2937", size=24)
+
+        legend_y = height - 120
+        for i, (name, color, _, label) in enumerate(PIE_SEGMENTS):
+            x = 60 + (i * (width - 120) // 3)
+            raster.rectangle(x, legend_y, x + 35, legend_y + 35, fill=color,
+                             outline="#ffffff", width=3)
+            raster.text(x + 45, legend_y + 8, label, color, size=12, anchor="w")
+            raster.text(x + 45, legend_y + 28,
+                        f"{values[name]:.1f} ({values[name] / total * 100:.1f}%)",
+                        "#6b7280", size=10, anchor="w")
+
+
+def write_frames(engine, directory, days, frames, graph="line", width=1600, height=700,
+                 bands=None, level=1):
+    """Simular ``days`` días guardando ``frames`` cuadros PNG repartidos en la corrida.
+
+    Devuelve las rutas escritas (``cuadro-000000.png``, ...).
+    """
+    os.makedirs(directory, exist_ok=True)
+    renderer = RasterRenderer(width, height)
+    paths = []
+    done = 0
+    for frame in range(frames):
+        target = days * (frame + 1) // frames
+        if target > done:
+            engine.run(target - done, notify=False)
+            done = target
+        path = os.path.join(directory, f"cuadro-{frame:06d}.png")
+        save_png(renderer.render(graph, engine, bands), path, level)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dibujar los gráficos sin pantalla (PNG)")
+    parser.add_argument("--days", type=int, default=1000, help="Días a simular")
+    parser.add_argument("--graph", choices=GRAPHS, default="line")
+    parser.add_argument("--width", type=int, default=1600)
+    parser.add_argument("--height", type=int, default=700)
+    parser.add_argument("--frames", type=int, default=0,
+                        help="Cuadros repartidos en la corrida (0 = sólo la imagen final)")
+    parser.add_argument("--output", default="grafico.png",
+                        help="Archivo PNG, o directorio si se piden cuadros")
+    args = parser.parse_args(argv)
+
+    engine = EcosystemEngine()
+    start = time.perf_counter()
+    if args.frames:
+        paths = write_frames(engine, args.output, args.days, args.frames, args.graph,
+                             args.width, args.height)
+        elapsed = time.perf_counter() - start
+        print(f"{len(paths)} cuadros en {args.output} ({len(paths) / elapsed * 60:,.0f} cuadros/min)")
+    else:
+        engine.run(args.days, notify=False)
+        save_png(RasterRenderer(args.width, args.height).render(args.graph, engine), args.output)
+        print(f"Gráfico guardado en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Capa reactiva mínima para la interfaz: sólo se toca Tk cuando algo cambió.
+
+Cada vista declara las entradas de las que depende (por ejemplo, la revisión
+del motor o el tipo de gráfico), una función ``render`` que produce su salida
+ya formateada (un texto, una tupla) y una función ``apply`` que la lleva a
+los widgets. En cada ``flush`` se leen las entradas una sola vez; una vista
+se recalcula sólo si cambió alguna de sus entradas, y ``apply`` se llama sólo
+si la salida formateada es distinta de la última aplicada. Así, un día en el
+que las etiquetas muestran lo mismo no reconfigura ningún widget ni provoca
+recálculos de geometría.
+
+``schedule`` junta varios cambios de estado del mismo cuadro en un único
+``flush`` (con ``after_idle`` de Tk).
+"""
+
+MISSING = object()
+
+
+class View:
+    def __init__(self, name, inputs, render, apply):
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.render = render
+        self.apply = apply
+        self.output = MISSING
+
+    def reset(self):
+        self.output = MISSING
+
+
+class Reactive:
+    def __init__(self, after_idle=None):
+        self.after_idle = after_idle
+        self.getters = {}
+        self.values = {}
+        self.views = []
+        self.pending = False
+        self.renders = 0
+        self.applies = 0
+
+    def input(self, name, getter):
+        """Declarar una entrada; ``getter()`` devuelve su valor actual"""
+        self.getters[name] = getter
+
+    def view(self, name, inputs, render, apply):
+        """Declarar una vista: ``apply(render(*entradas))`` cuando la salida cambie"""
+        view = View(name, inputs, render, apply)
+        self.views.append(view)
+        return view
+
+    def invalidate(self, *names):
+        """Forzar el recálculo de las vistas ``names`` (o de todas) en el próximo ``flush``"""
+        for view in self.views:
+            if not names or view.name in names:
+                view.reset()
+
+    def schedule(self, callback=None):
+        """Pedir un ``flush`` (o ``callback``, que debe llamarlo); las peticiones
+        hasta que se ejecute se juntan en una"""
+        callback = callback or self.flush
+        if self.pending:
+            return
+        if self.after_idle is None:
+            callback()
+            return
+        self.pending = True
+        self.after_idle(callback)
+
+    def flush(self, lap=None):
+        """Recalcular las vistas cuyas entradas cambiaron y aplicar las salidas nuevas.
+
+        ``lap(nombre)`` se llama tras cada vista (para ``PhaseTimer``).
+        Devuelve la cantidad de vistas aplicadas.
+        """
+        self.pending = False
+        old = self.values
+        values = {name: getter() for name, getter in self.getters.items()}
+        changed = {name for name, value in values.items()
+                   if name not in old or old[name] != value}
+        self.values = values
+
+        applied = 0
+        for view in self.views:
+            if view.output is MISSING or not changed.isdisjoint(view.inputs):
+                self.renders += 1
+                output = view.render(*(values[name] for name in view.inputs))
+                if output != view.output:
+                    view.output = output
+                    view.apply(output)
+                    applied += 1
+            if lap:
+                lap(view.name)
+        self.applies += applied
+        return applied
@@ -0,0 +1,173 @@
+"""Detección de puntos fijos, ciclos y extinción permanente.
+
+Muchas corridas llegan a un estado que ya no cambia (por ejemplo, zorros y
+conejos extintos y zanahorias en ``max_carrots``) o a un ciclo, mucho antes
+del horizonte pedido. ``CycleDetector`` aplica el algoritmo de Brent sobre
+los estados (cuantizados con ``tolerance``) a medida que se simulan, con
+memoria constante. Al detectar un ciclo de período ``p`` los días restantes
+se pueden extrapolar copiando el último período del historial en lugar de
+simularlos.
+
+Con ``tolerance=0`` sólo cuenta una repetición exacta del estado; como el
+modelo es determinista, la extrapolación es entonces idéntica a simular.
+"""
+
+import math
+from array import array
+
+FIXED_POINT = 'fixed_point'
+CYCLE = 'cycle'
+EXTINCTION = 'extinction'
+
+
+def quantize(state, tolerance):
+    """Clave del estado: valores redondeados a múltiplos de ``tolerance``.
+
+    NaN se convierte en ``None`` para que un estado divergente (que ya no
+    cambia) cuente como repetido.
+    """
+    if not tolerance:
+        return tuple(None if value != value else value for value in state)
+    return tuple(round(value / tolerance) if math.isfinite(value) else
+                 None if value != value else value for value in state)
+
+
+class CycleDetector:
+    """Algoritmo de Brent en línea sobre estados ``(zorros, conejos, zanahorias)``.
+
+    Con ``deterministic=False`` (modelos estocásticos) un estado repetido no
+    garantiza que el futuro se repita, así que sólo se informa la extinción
+    de zorros y conejos, que es absorbente.
+    """
+
+    def __init__(self, tolerance=0.0, deterministic=True):
+        self.tolerance = tolerance
+        self.deterministic = deterministic
+        self.reset()
+
+    def reset(self, day=0):
+        self.tortoise = None
+        self.power = 1
+        self.lam = 1
+        self.day = day
+        self.result = None
+
+    def observe(self, state):
+        """Registrar el estado de un día (en orden); devuelve el resultado al detectarlo"""
+        key = quantize(state, self.tolerance)
+        day = self.day
+        self.day += 1
+        if self.result is not None:
+            return self.result
+
+        if self.tortoise is None:
+            self.tortoise = key
+            return None
+
+        if key == self.tortoise:
+            extinct = key[0] == 0 and key[1] == 0
+            if self.lam == 1 and extinct:
+                kind = EXTINCTION
+            elif self.lam == 1:
+                kind = FIXED_POINT
+            else:
+                kind = CYCLE
+            if self.deterministic or kind == EXTINCTION:
+                self.result = {'kind': kind, 'period': self.lam,
+                               'day': day, 'start_day': day - self.lam}
+                return self.result
+
+        if self.power == self.lam:
+            self.tortoise = key
+            self.power *= 2
+            self.lam = 0
+        self.lam += 1
+        return None
+
+
+def extrapolate(engine, days, period):
+    """Completar ``days`` días repitiendo el último período del historial.
+
+    El estado actual del motor debe coincidir con el de hace ``period`` días.
+    """
+    history = engine.history
+    history.reserve(days)
+    buffers = history.buffers
+    start = history.length - period
+    end = history.length + days
+
+    buffers['day'][history.length:end] = array('q', range(engine.day, engine.day + days))
+    # Copias por bloques que se duplican (siempre un múltiplo del período)
+    while history.length < end:
+        length = history.length
+        count = min(length - start, end - length)
+        for name in ('foxes', 'rabbits', 'carrots'):
+            buffers[name][length:length + count] = buffers[name][start:start + count]
+        history.length = length + count
+
+    source = end - period
+    engine.day += days
+    engine.foxes = buffers['foxes'][source]
+    engine.rabbits = buffers['rabbits'][source]
+    engine.carrots = buffers['carrots'][source]
+
+
+def run_until_steady(engine, days, tolerance=0.0, extrapolate_rest=True, chunk=1024):
+    """Simular hasta ``days`` días, deteniéndose al llegar a un punto fijo o ciclo.
+
+    Con ``extrapolate_rest`` los días restantes se completan copiando el
+    ciclo; si no, el motor se queda en el día de la detección. Devuelve el
+    resultado del detector (o ``None``) con ``simulated``, los días que se
+    simularon de verdad.
+    """
+    detector = CycleDetector(tolerance, deterministic=not hasattr(engine, 'rng'))
+    detector.reset(engine.day)
+    history = engine.history
+    end = engine.day + days
+    start_day = engine.day
+
+    while engine.day < end:
+        first = history.length
+        engine.run(min(chunk, end - engine.day), notify=False)
+        buffers = history.buffers
+        for i in range(first, history.length):
+            if detector.observe((buffers['foxes'][i], buffers['rabbits'][i], buffers['carrots'][i])):
+                break
+        if detector.result:
+            break
+
+    result = detector.result
+    if result:
+        result = dict(result, simulated=engine.day - start_day)
+        # El historial termina en un día ya dentro del ciclo
+        if extrapolate_rest and engine.day < end and history.length >= result['period']:
+            extrapolate(engine, end - engine.day, result['period'])
+    engine.notify()
+    return result
+
+
+class SteadyStateMonitor:
+    """Observador que alimenta el detector con los días nuevos del historial"""
+
+    def __init__(self, engine, tolerance=0.0):
+        self.detector = CycleDetector(tolerance, deterministic=not hasattr(engine, 'rng'))
+        self.fed = 0
+        engine.add_observer(self)
+
+    @property
+    def result(self):
+        return self.detector.result
+
+    def __call__(self, engine):
+        history = engine.history
+        if len(history) < self.fed:
+            self.fed = 0
+        if self.fed == 0:
+            self.detector.reset(history.buffers['day'][0] if len(history) else engine.day)
+        if self.detector.result is None:
+            buffers = history.buffers
+            observe = self.detector.observe
+            for i in range(self.fed, len(history)):
+                if observe((buffers['foxes'][i], buffers['rabbits'][i], buffers['carrots'][i])):
+                    break
+        self.fed = len(history)
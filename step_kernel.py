@@ -0,0 +1,96 @@
+"""Núcleo compilado (Numba) del paso diario de ``EcosystemEngine.run``.
+
+Recorre N días de la misma recurrencia que el bucle de Python y escribe cada
+estado directamente en los buffers preasignados del historial. Las
+operaciones son las mismas y en el mismo orden, y ``min``/``max`` se
+escriben con las mismas comparaciones que los de Python (que devuelven el
+primer argumento en caso de empate), así que las trayectorias son idénticas
+bit a bit.
+
+Numba es opcional: si no está instalado, ``HAS_NUMBA`` es False y el
+motor sigue con su bucle de Python. La primera compilación se guarda en
+``__pycache__`` (``cache=True``) y no se repite en las ejecuciones siguientes.
+"""
+
+import importlib.util
+from functools import lru_cache
+
+# En bloques más cortos no compensa preparar los arreglos (ni, la primera vez,
+# importar Numba y compilar)
+KERNEL_MIN_DAYS = 512
+
+HAS_NUMBA = importlib.util.find_spec("numba") is not None
+
+
+def run_days(days, i, day, foxes, rabbits, carrots,
+             rabbits_per_fox, carrots_per_rabbit, fox_death_rate,
+             rabbit_birth_rate, rabbit_death_rate, carrot_growth, max_carrots,
+             h_day, h_foxes, h_rabbits, h_carrots):
+    """Avanzar ``days`` días guardando cada estado desde la fila ``i``.
+
+    Devuelve el estado final ``(day, foxes, rabbits, carrots)``.
+    """
+    for _ in range(days):
+        h_day[i] = day
+        h_foxes[i] = foxes
+        h_rabbits[i] = rabbits
+        h_carrots[i] = carrots
+        i += 1
+
+        # min(a, b) de Python: b sólo si b < a
+        rabbits_eaten = foxes * rabbits_per_fox
+        if not rabbits_eaten < rabbits:
+            rabbits_eaten = rabbits
+        carrots_eaten = rabbits * carrots_per_rabbit
+        if not carrots_eaten < carrots:
+            carrots_eaten = carrots
+
+        # max(0, x) de Python: x sólo si x > 0
+        fox_survival = rabbits_eaten - foxes * fox_death_rate
+        if not fox_survival > 0:
+            fox_survival = 0.0
+        foxes = foxes - foxes * fox_death_rate + fox_survival * 0.1
+        if not foxes > 0:
+            foxes = 0.0
+
+        rabbits = (rabbits - rabbits_eaten +
+                   rabbits * rabbit_birth_rate -
+                   rabbits * rabbit_death_rate)
+        if not rabbits > 0:
+            rabbits = 0.0
+
+        carrots = carrots - carrots_eaten + carrots * carrot_growth
+        if not carrots > 0:
+            carrots = 0.0
+        if max_carrots < carrots:
+            carrots = max_carrots
+
+        day += 1
+    return day, foxes, rabbits, carrots
+
+
+@lru_cache(maxsize=None)
+def compiled():
+    """``run_days`` compilado con Numba (se compila la primera vez que se pide)"""
+    from numba import njit
+
+    return njit(cache=True, nogil=True)(run_days)
+
+
+def run(history, days, state, coefficients):
+    """Avanzar ``days`` días con el núcleo compilado a partir de ``state``.
+
+    ``history`` ya debe tener espacio reservado; se escriben las filas desde
+    ``history.length`` pero no se actualiza la longitud. ``coefficients`` son
+    los siete coeficientes en el orden de ``run_days``.
+    """
+    import numpy as np
+
+    buffers = history.buffers
+    columns = [np.frombuffer(buffers[name], dtype=dtype)
+               for name, dtype in (('day', np.int64), ('foxes', np.float64),
+                                   ('rabbits', np.float64), ('carrots', np.float64))]
+    day, foxes, rabbits, carrots = state
+    return compiled()(days, history.length, int(day),
+                      float(foxes), float(rabbits), float(carrots),
+                      *(float(value) for value in coefficients), *columns)
@@ -0,0 +1,191 @@
+"""Variante estocástica (ruido demográfico) y simulación Monte Carlo.
+
+Los nacimientos, muertes y la depredación de cada día se sortean con
+distribuciones binomiales y de Poisson cuyas medias son las cantidades de
+``EcosystemEngine``, así que las poblaciones son enteras y pueden
+extinguirse de verdad. El corredor Monte Carlo ejecuta miles de réplicas
+vectorizadas (y opcionalmente en un grupo de procesos) con flujos de números
+aleatorios reproducibles, y devuelve la distribución de los tiempos de
+extinción y bandas de percentiles por día.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ecosystem_engine import EcosystemEngine
+
+# Por encima de este tamaño el ruido demográfico es despreciable y se usa la media
+LARGE_POPULATION = 1e12
+
+
+def binomial(rng, n, p):
+    """Sorteo binomial sobre arreglos de tamaños reales (media para los muy grandes)"""
+    p = np.broadcast_to(p, n.shape)
+    out = n * p
+    small = n < LARGE_POPULATION
+    out[small] = rng.binomial(n[small].astype(np.int64), p[small])
+    return out
+
+
+def poisson(rng, lam):
+    """Sorteo de Poisson (media para las tasas muy grandes)"""
+    out = np.array(lam, dtype=np.float64)
+    small = out < LARGE_POPULATION
+    out[small] = rng.poisson(out[small])
+    return out
+
+
+@np.errstate(over='ignore', invalid='ignore')
+def stochastic_step(rng, foxes, rabbits, carrots, p):
+    """Avanzar un día en arreglos de réplicas; devuelve las nuevas poblaciones.
+
+    La media de un paso es el paso de ``next_state``: los sorteos tienen las
+    medias del modelo determinista y nunca dejan una población negativa que
+    haya que recortar (el recorte sesgaría la media). Como en el modelo
+    determinista, una población que crece sin límite termina en ``inf`` sin
+    lanzar errores.
+    """
+    # 1. Zorros cazan conejos: cada conejo es cazado con la probabilidad
+    # que da la media del modelo determinista
+    expected_eaten = np.minimum(rabbits, foxes * p['rabbits_per_fox_per_day'])
+    catch_probability = np.divide(expected_eaten, rabbits,
+                                  out=np.zeros_like(rabbits), where=rabbits > 0)
+    rabbits_eaten = binomial(rng, rabbits, catch_probability)
+
+    # 2. Conejos comen zanahorias (recurso continuo)
+    carrots_eaten = np.minimum(carrots, rabbits * p['carrots_per_rabbit_per_day'])
+
+    # 3. Zorros: muertes binomiales y nacimientos de Poisson si hay comida. La
+    # tasa de nacimientos usa la caza media (como en ``next_state``); con la
+    # caza sorteada, el recorte en cero subiría la media
+    fox_deaths = binomial(rng, foxes, p['fox_death_rate'])
+    fox_births = poisson(rng, np.maximum(0, expected_eaten - foxes * p['fox_death_rate']) * 0.1)
+    new_foxes = np.maximum(0, foxes - fox_deaths + fox_births)
+
+    # Conejos: los no cazados y los recién nacidos del día pueden morir. La
+    # probabilidad de muerte hace que las muertes medias sean
+    # ``rabbits * rabbit_death_rate``, como en el modelo determinista; si
+    # pasara de 1, el modelo determinista también termina en cero
+    survivors = rabbits - rabbits_eaten
+    rabbit_births = poisson(rng, rabbits * p['rabbit_birth_rate'])
+    exposed = rabbits - expected_eaten + rabbits * p['rabbit_birth_rate']
+    death_probability = np.divide(rabbits * p['rabbit_death_rate'], exposed,
+                                  out=np.ones_like(rabbits), where=exposed > 0)
+    rabbit_deaths = binomial(rng, survivors + rabbit_births, np.minimum(1, death_probability))
+    new_rabbits = survivors + rabbit_births - rabbit_deaths
+
+    # Zanahorias: son comidas pero crecen
+    new_carrots = np.maximum(0, carrots - carrots_eaten + carrots * (p['carrot_growth_rate'] / 100))
+    new_carrots = np.minimum(new_carrots, p['max_carrots'])
+
+    return new_foxes, new_rabbits, new_carrots
+
+
+class StochasticEcosystemEngine(EcosystemEngine):
+    def __init__(self, params=None, seed=None):
+        self.seed = seed
+        super().__init__(params)
+
+    def reset(self):
+        self.rng = np.random.default_rng(self.seed)
+        super().reset()
+        self.foxes = float(round(self.foxes))
+        self.rabbits = float(round(self.rabbits))
+
+    def get_state(self):
+        state = super().get_state()
+        state['rng'] = self.rng.bit_generator.state
+        return state
+
+    def set_state(self, state):
+        self.rng.bit_generator.state = state['rng']
+        super().set_state(state)
+
+    def run(self, days, notify=True):
+        p = self.params
+        rng = self.rng
+        history = self.history
+        history.reserve(days)
+
+        foxes = np.array([self.foxes])
+        rabbits = np.array([self.rabbits])
+        carrots = np.array([self.carrots])
+        for _ in range(days):
+            # Guardar estado actual
+            history.append(self.day, foxes[0], rabbits[0], carrots[0])
+            foxes, rabbits, carrots = stochastic_step(rng, foxes, rabbits, carrots, p)
+            self.day += 1
+
+        self.foxes, self.rabbits, self.carrots = float(foxes[0]), float(rabbits[0]), float(carrots[0])
+
+        if notify:
+            self.notify()
+
+
+@np.errstate(over='ignore', invalid='ignore')
+def simulate_replicates(params, replicates, days, seed_sequence):
+    """Simular ``replicates`` réplicas vectorizadas; devuelve trayectorias (days, replicates)"""
+    rng = np.random.default_rng(seed_sequence)
+    p = dict(EcosystemEngine(params).params)
+
+    foxes = np.full(replicates, float(round(p['foxes_init'])))
+    rabbits = np.full(replicates, float(round(p['rabbits_init'])))
+    carrots = np.full(replicates, float(p['carrots_init']))
+
+    trajectories = {name: np.empty((days, replicates), dtype=np.float32)
+                    for name in ('foxes', 'rabbits', 'carrots')}
+    for day in range(days):
+        trajectories['foxes'][day] = foxes
+        trajectories['rabbits'][day] = rabbits
+        trajectories['carrots'][day] = carrots
+        foxes, rabbits, carrots = stochastic_step(rng, foxes, rabbits, carrots, p)
+    return trajectories
+
+
+def extinction_times(trajectory):
+    """Primer día con población cero de cada réplica (-1 si nunca se extingue)"""
+    extinct = trajectory <= 0
+    first = extinct.argmax(axis=0)
+    return np.where(extinct.any(axis=0), first, -1)
+
+
+def run_monte_carlo(params=None, replicates=1000, days=365, seed=None,
+                    percentiles=(5, 50, 95), processes=None, chunk_size=1000):
+    """Ejecutar réplicas estocásticas y resumir los resultados.
+
+    Las réplicas se reparten en bloques de ``chunk_size``, cada uno con su
+    propio flujo aleatorio derivado de ``seed``, así que el resultado no
+    depende del número de procesos. Con ``processes`` distinto de ``None``
+    los bloques se ejecutan en un grupo de procesos.
+
+    Devuelve un diccionario con ``day``, los tiempos de extinción por especie
+    (``extinction``), la probabilidad de extinción (``extinction_probability``)
+    y ``bands``: para cada especie, un arreglo (len(percentiles), days).
+    """
+    sizes = [min(chunk_size, replicates - start) for start in range(0, replicates, chunk_size)]
+    streams = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(params, size, days, stream) for size, stream in zip(sizes, streams)]
+
+    if processes is None:
+        chunks = [simulate_replicates(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            chunks = list(pool.map(simulate_replicates, *zip(*jobs)))
+
+    result = {
+        'day': np.arange(days),
+        'replicates': replicates,
+        'percentiles': tuple(percentiles),
+        'extinction': {},
+        'extinction_probability': {},
+        'bands': {}
+    }
+    for name in ('foxes', 'rabbits', 'carrots'):
+        trajectory = np.concatenate([chunk[name] for chunk in chunks], axis=1)
+        times = extinction_times(trajectory)
+        result['extinction'][name] = times
+        result['extinction_probability'][name] = float((times >= 0).mean())
+        with np.errstate(invalid='ignore'):
+            result['bands'][name] = np.nanpercentile(trajectory, percentiles, axis=1)
+    return result
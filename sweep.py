@@ -0,0 +1,261 @@
+"""Barrido de parámetros en paralelo desde la línea de comandos.
+
+Ejemplo::
+
+    python sweep.py --days 100000 --out resultados \\
+        --param fox_death_rate=0.01:0.1:0.01 --param max_carrots=100,500,1000
+
+Cada escenario es una combinación de los rangos dados (producto cartesiano)
+y se identifica por su posición en ese producto. Los escenarios se reparten
+en bloques entre todos los núcleos y los resultados se escriben en columnas
+binarias (un archivo de float64 por columna) a medida que llegan. Si el
+barrido se interrumpe, al volver a lanzarlo se saltan los escenarios ya
+escritos.
+
+Los escenarios que llegan a un punto fijo o a un ciclo dejan de simularse y
+sus valores finales se extrapolan (``--tolerance`` controla cuándo dos
+estados cuentan como iguales; ``--no-early-stop`` lo desactiva). Con
+``--cache-mb`` cada proceso avanza los escenarios con una caché de
+transiciones y saltos de potencias de dos (``transition_cache``).
+"""
+
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import sys
+from array import array
+
+from ecosystem_engine import DEFAULT_PARAMS, EcosystemEngine
+from steady_state import run_until_steady
+from transition_cache import TransitionCache
+
+try:
+    import numpy as np
+    from batch_engine import BatchCycleDetector, BatchEcosystemEngine, params_matrix
+except ImportError:
+    np = None
+
+SPECIES = ('foxes', 'rabbits', 'carrots')
+
+# Caché de transiciones de cada proceso del grupo (None = no usarla)
+CACHE = None
+METRICS = tuple(f'final_{name}' for name in SPECIES) + tuple(f'{name}_extinction_day' for name in SPECIES)
+
+
+def parse_range(text):
+    """``clave=inicio:fin:paso`` (fin incluido) o ``clave=v1,v2,...``"""
+    key, _, values = text.partition('=')
+    key = key.strip()
+    if key not in DEFAULT_PARAMS:
+        raise argparse.ArgumentTypeError(f"Parámetro desconocido: {key}")
+
+    if ':' in values:
+        start, stop, step = (float(v) for v in values.split(':'))
+        if step <= 0:
+            raise argparse.ArgumentTypeError(f"El paso de {key} debe ser positivo")
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        return key, [start + i * step for i in range(count)]
+    return key, [float(v) for v in values.split(',')]
+
+
+class ResultStore:
+    """Resultados en columnas binarias, con escritura incremental y reanudación"""
+
+    def __init__(self, path, columns, header):
+        self.path = path
+        self.columns = list(columns)
+        os.makedirs(path, exist_ok=True)
+
+        header_path = os.path.join(path, 'columns.json')
+        header = dict(header, columns=self.columns, byteorder=sys.byteorder)
+        if os.path.exists(header_path):
+            with open(header_path, encoding='utf-8') as f:
+                existing = json.load(f)
+            if existing != header:
+                raise ValueError(f"{path} contiene un barrido con otra configuración")
+        else:
+            with open(header_path, 'w', encoding='utf-8') as f:
+                json.dump(header, f, indent=2)
+
+        self.repair()
+        self.files = {name: open(self.column_path(name), 'ab') for name in self.columns}
+
+    def column_path(self, name):
+        return os.path.join(self.path, f'{name}.f8')
+
+    def repair(self):
+        """Recortar todas las columnas a la longitud común (por si hubo una interrupción)"""
+        sizes = [os.path.getsize(self.column_path(name)) if os.path.exists(self.column_path(name)) else 0
+                 for name in self.columns]
+        rows = min(sizes) // 8
+        for name, size in zip(self.columns, sizes):
+            if size != rows * 8:
+                with open(self.column_path(name), 'r+b') as f:
+                    f.truncate(rows * 8)
+
+    def completed(self):
+        """Identificadores de los escenarios ya escritos"""
+        return set(int(v) for v in read_column(self.path, 'scenario_id'))
+
+    def append(self, rows):
+        for name in self.columns:
+            array('d', (row[name] for row in rows)).tofile(self.files[name])
+        for f in self.files.values():
+            f.flush()
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+
+def read_column(path, name):
+    values = array('d')
+    column_path = os.path.join(path, f'{name}.f8')
+    if os.path.exists(column_path):
+        with open(column_path, 'rb') as f:
+            values.frombytes(f.read())
+    return values
+
+
+def read_results(path):
+    """Leer un barrido completo como ``{columna: array('d')}``"""
+    with open(os.path.join(path, 'columns.json'), encoding='utf-8') as f:
+        header = json.load(f)
+    return {name: read_column(path, name) for name in header['columns']}
+
+
+def first_zero(values):
+    try:
+        return values.index(0.0)
+    except ValueError:
+        return -1
+
+
+def run_chunk_scalar(scenarios, days, tolerance=None):
+    results = []
+    for scenario_id, params in scenarios:
+        engine = EcosystemEngine(params)
+        if tolerance is None:
+            engine.run(days, notify=False)
+        else:
+            run_until_steady(engine, days, tolerance)
+        row = {'scenario_id': scenario_id}
+        row.update(params)
+        for name in SPECIES:
+            row[f'final_{name}'] = getattr(engine, name)
+            row[f'{name}_extinction_day'] = first_zero(engine.history.buffers[name][:engine.history.length])
+        results.append(row)
+    return results
+
+
+def run_chunk_cached(scenarios, days, cache):
+    results = []
+    for scenario_id, params in scenarios:
+        engine = EcosystemEngine(params)
+        state, zeros = cache.jump(engine.state()[1:], engine.params, days)
+        row = {'scenario_id': scenario_id}
+        row.update(params)
+        for name, value, zero in zip(SPECIES, state, zeros):
+            row[f'final_{name}'] = value
+            row[f'{name}_extinction_day'] = zero
+        results.append(row)
+    return results
+
+
+def init_worker(cache_mb, tolerance):
+    global CACHE
+    if cache_mb:
+        CACHE = TransitionCache(int(cache_mb * 2 ** 20), tolerance or 0.0)
+
+
+def run_chunk_batch(scenarios, days, tolerance=None):
+    engine = BatchEcosystemEngine(params_matrix([params for _, params in scenarios]))
+    extinction = {name: np.full(len(engine), -1) for name in SPECIES}
+    detector = BatchCycleDetector(engine, tolerance) if tolerance is not None else None
+    for day in range(days):
+        # El historial guarda el estado al inicio de cada día
+        for name in SPECIES:
+            newly = (extinction[name] < 0) & (getattr(engine, name) == 0)
+            extinction[name][newly] = day
+        engine.run(1)
+        # Cuando todos los escenarios entran en un ciclo, los días que faltan no
+        # pueden traer extinciones nuevas: todos los estados del ciclo ya se vieron
+        if detector and detector.observe(engine):
+            detector.extrapolate(engine, days - engine.day)
+            break
+
+    results = []
+    for k, (scenario_id, params) in enumerate(scenarios):
+        row = {'scenario_id': scenario_id}
+        row.update(params)
+        for name in SPECIES:
+            row[f'final_{name}'] = float(getattr(engine, name)[k])
+            row[f'{name}_extinction_day'] = int(extinction[name][k])
+        results.append(row)
+    return results
+
+
+def run_chunk(job):
+    scenarios, days, tolerance = job
+    if CACHE is not None:
+        return run_chunk_cached(scenarios, days, CACHE)
+    if np is not None:
+        return run_chunk_batch(scenarios, days, tolerance)
+    return run_chunk_scalar(scenarios, days, tolerance)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Barrido de parámetros del ecosistema en paralelo")
+    parser.add_argument("--param", action="append", type=parse_range, default=[],
+                        metavar="CLAVE=RANGO",
+                        help="Rango de un parámetro: inicio:fin:paso o v1,v2,... (se puede repetir)")
+    parser.add_argument("--days", type=int, default=1000, help="Días a simular por escenario")
+    parser.add_argument("--out", required=True, help="Directorio de resultados (se reanuda si existe)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Procesos en paralelo")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Escenarios por bloque enviado a cada proceso")
+    parser.add_argument("--tolerance", type=float, default=0.0,
+                        help="Diferencia bajo la cual dos estados son iguales al detectar ciclos")
+    parser.add_argument("--no-early-stop", action="store_true",
+                        help="Simular siempre todos los días, sin detectar puntos fijos ni ciclos")
+    parser.add_argument("--cache-mb", type=float, default=0,
+                        help="Memoria por proceso para la caché de transiciones (0 = sin caché)")
+    args = parser.parse_args(argv)
+    tolerance = None if args.no_early_stop else args.tolerance
+
+    ranges = dict(args.param)
+    keys = list(ranges)
+    scenarios = [
+        (scenario_id, dict(zip(keys, values)))
+        for scenario_id, values in enumerate(itertools.product(*ranges.values()))
+    ]
+
+    store = ResultStore(args.out, ['scenario_id'] + keys + list(METRICS),
+                        {'days': args.days, 'ranges': ranges, 'base_params': DEFAULT_PARAMS,
+                         'tolerance': tolerance, 'cache': bool(args.cache_mb)})
+    done = store.completed()
+    pending = [scenario for scenario in scenarios if scenario[0] not in done]
+    print(f"{len(scenarios)} escenarios, {len(done)} ya completados, {len(pending)} pendientes")
+
+    # Bloques grandes para amortizar la comunicación, pero varios por proceso para repartir carga
+    chunk_size = args.chunk_size or max(1, min(256, math.ceil(len(pending) / (args.workers * 4))))
+    jobs = [(pending[i:i + chunk_size], args.days, tolerance)
+            for i in range(0, len(pending), chunk_size)]
+
+    finished = 0
+    try:
+        with multiprocessing.Pool(args.workers, init_worker, (args.cache_mb, tolerance)) as pool:
+            for rows in pool.imap_unordered(run_chunk, jobs):
+                store.append(rows)
+                finished += len(rows)
+                print(f"\r{finished}/{len(pending)} escenarios", end="", flush=True)
+    finally:
+        store.close()
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Población acotada por las zanahorias y vecinos por agente acotados al crecer la población."""
+
+import numpy as np
+
+from agent_model import AgentEcosystemEngine
+
+
+def test_default_population_stays_bounded():
+    engine = AgentEcosystemEngine(seed=1)
+    engine.run(300, notify=False)
+    # Sin límite de comida los conejos pasaban del millón antes del día 150
+    assert engine.rabbits < 1000
+
+
+def candidates_per_fox(agents):
+    """Conejos que revisa en promedio la búsqueda de cada zorro (sus 3x3 celdas)"""
+    engine = AgentEcosystemEngine({'foxes_init': agents // 10, 'rabbits_init': agents - agents // 10},
+                                  seed=1)
+    grid = engine.grid
+    _, _, counts = grid.build(engine.rabbit_x, engine.rabbit_y)
+    cells = grid.cell_of(engine.fox_x, engine.fox_y)
+    cx, cy = cells % grid.nx, cells // grid.nx
+    total = np.zeros(len(cells), dtype=np.int64)
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            total += counts[((cy + dy) % grid.ny) * grid.nx + (cx + dx) % grid.nx]
+    return total.mean()
+
+
+def test_neighbour_candidates_do_not_grow_with_agents():
+    small = candidates_per_fox(20_000)
+    large = candidates_per_fox(200_000)
+    # El mapa crece con la población: la densidad y los candidatos por
+    # búsqueda se mantienen (con un mapa fijo serían diez veces más)
+    assert large < 1.5 * small
+    assert large < 10
@@ -0,0 +1,28 @@
+"""Saltar de día con los puntos de control sin perder el historial."""
+
+from checkpoint import CheckpointManager
+from ecosystem_engine import EcosystemEngine
+
+
+def reference(days):
+    engine = EcosystemEngine()
+    engine.run(days, notify=False)
+    return engine.history.rows()
+
+
+def test_jump_back_and_forward_keeps_history():
+    engine = EcosystemEngine()
+    checkpoints = CheckpointManager(engine, interval=100, keep=64)
+    checkpoints.run(1000)
+
+    checkpoints.jump_to(250)
+    assert engine.day == 250
+    assert engine.history.rows() == reference(250)
+
+    # El punto de control del día 1000 está más allá del historial en memoria:
+    # se simula hacia adelante desde el día 250 en lugar de restaurarlo
+    simulated = checkpoints.jump_to(1000)
+    assert simulated == 750
+    assert engine.day == 1000
+    assert engine.history.rows() == reference(1000)
+
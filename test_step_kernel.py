@@ -0,0 +1,37 @@
+"""El núcleo compilado produce el mismo historial, bit a bit, que el bucle de Python."""
+
+import pytest
+
+pytest.importorskip("numba")
+
+import step_kernel
+from ecosystem_engine import EcosystemEngine
+
+DAYS = 3 * step_kernel.KERNEL_MIN_DAYS
+
+
+def trajectory(params, compiled, chunks):
+    engine = EcosystemEngine(params)
+    engine.compiled = compiled
+    for days in chunks:
+        engine.run(days, notify=False)
+    history = engine.history
+    buffers = [bytes(history.buffers[name][:history.length])
+               for name in ('day', 'foxes', 'rabbits', 'carrots')]
+    return buffers, (engine.day, engine.foxes, engine.rabbits, engine.carrots)
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    # Sin muertes de zorros y con el tope de zanahorias alcanzado
+    {'fox_death_rate': 0, 'max_carrots': 300},
+    # Conejos que se disparan y zanahorias que se agotan
+    {'rabbits_per_fox_per_day': 0.01, 'rabbit_birth_rate': 0.2, 'carrot_growth_rate': 50},
+    # Extinción temprana de conejos y zorros
+    {'rabbits_per_fox_per_day': 5.0, 'rabbit_birth_rate': 0.0},
+    # Parámetros enteros (el núcleo los convierte a float)
+    {'foxes_init': 3, 'rabbits_init': 400, 'carrot_growth_rate': 5, 'max_carrots': 1000},
+])
+@pytest.mark.parametrize("chunks", [[DAYS], [300, DAYS - 300]])
+def test_compiled_matches_python(params, chunks):
+    assert trajectory(params, True, chunks) == trajectory(params, False, chunks)
@@ -0,0 +1,32 @@
+"""La media de un paso estocástico es el paso del modelo determinista."""
+
+import numpy as np
+import pytest
+
+from ecosystem_engine import DEFAULT_PARAMS, next_state
+from stochastic_model import stochastic_step
+
+SAMPLES = 200_000
+
+
+@pytest.mark.parametrize("state, params", [
+    ((10, 50, 200), {}),
+    # Los zorros piden más conejos de los que hay
+    ((40, 15, 100), {}),
+    # Muertes de conejos mayores que los que quedan tras la caza
+    ((30, 20, 300), {'rabbit_death_rate': 0.4, 'rabbit_birth_rate': 0.05}),
+    # Zanahorias en el tope y escasas
+    ((5, 120, 500), {'carrot_growth_rate': 40}),
+    ((2, 300, 10), {}),
+])
+def test_step_mean_matches_next_state(state, params):
+    p = dict(DEFAULT_PARAMS, **params)
+    rng = np.random.default_rng(2024)
+    replicates = [np.full(SAMPLES, float(value)) for value in state]
+
+    samples = stochastic_step(rng, *replicates, p)
+    expected = next_state(*state, p)
+
+    for name, values, mean in zip(('foxes', 'rabbits', 'carrots'), samples, expected):
+        error = values.std() / np.sqrt(SAMPLES)
+        assert abs(values.mean() - mean) <= 5 * error + 1e-9, name
@@ -0,0 +1,306 @@
+"""Formato binario de trayectorias para corridas muy largas.
+
+Estructura del archivo::
+
+    b"ECOTRAJ1"  longitud del encabezado (uint32, little endian)  encabezado JSON
+    relleno hasta múltiplo de 64 bytes
+    filas de ancho fijo: zorros, conejos, zanahorias (float32 o float64)
+
+El encabezado guarda el diccionario ``params``, el tipo de dato, el orden
+de bytes y el primer día; el día de cada fila es ``start_day + índice``, así
+que no ocupa espacio. El archivo se escribe sólo añadiendo filas al final y
+se lee con ``mmap``: varios procesos pueden leerlo a la vez, incluso mientras
+otro sigue escribiendo, sin cargarlo en memoria.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+
+from decimation import MinMaxPyramid
+from history_store import HistoryStore
+
+MAGIC = b"ECOTRAJ1"
+ALIGNMENT = 64
+COLUMNS = ('foxes', 'rabbits', 'carrots')
+# Bloques base de las pirámides de un archivo (64 días): ocupan un cuarto que
+# las del historial en memoria y el resto se recorre en el mapa
+MAPPED_BASE_LEVEL = 6
+
+
+def write_header(f, params, typecode, start_day):
+    header = json.dumps({
+        'params': params,
+        'columns': list(COLUMNS),
+        'typecode': typecode,
+        'byteorder': sys.byteorder,
+        'start_day': start_day
+    }).encode('utf-8')
+    f.write(MAGIC + struct.pack('<I', len(header)) + header)
+    padding = -f.tell() % ALIGNMENT
+    f.write(b' ' * padding)
+
+
+def read_header(f):
+    """Devolver (encabezado, desplazamiento de los datos)"""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("No es un archivo de trayectoria")
+    (size,) = struct.unpack('<I', f.read(4))
+    header = json.loads(f.read(size).decode('utf-8'))
+    offset = len(MAGIC) + 4 + size
+    return header, offset + (-offset % ALIGNMENT)
+
+
+class TrajectoryWriter:
+    def __init__(self, path, params=None, typecode='d', start_day=0, resume=False):
+        """Crear el archivo (reemplazando uno existente) o, con ``resume``,
+        continuar uno existente de la misma corrida.
+
+        Para continuar, el encabezado debe tener el mismo formato, los mismos
+        ``params`` y el mismo ``start_day``; si no, se lanza ``ValueError``.
+        """
+        self.path = path
+        self.typecode = typecode
+        self.params = dict(params or {})
+
+        if resume and os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as f:
+                header, self.data_offset = read_header(f)
+            if header['typecode'] != typecode or header['byteorder'] != sys.byteorder:
+                raise ValueError(f"{path} usa otro tipo de dato u orden de bytes")
+            self.params = header['params']
+            self.start_day = header['start_day']
+            self.check(params, start_day)
+            self.file = open(path, 'r+b')
+            # Descartar una fila a medio escribir
+            row_size = array(typecode).itemsize * len(COLUMNS)
+            rows = (os.path.getsize(path) - self.data_offset) // row_size
+            self.file.truncate(self.data_offset + rows * row_size)
+            self.rows = rows
+            self.file.seek(0, os.SEEK_END)
+        else:
+            self.start_day = start_day
+            self.file = open(path, 'wb')
+            write_header(self.file, self.params, typecode, start_day)
+            self.data_offset = self.file.tell()
+            self.rows = 0
+
+    def check(self, params, start_day):
+        """Comprobar que el archivo es de la corrida con ``params`` desde ``start_day``"""
+        if params is not None and dict(params) != self.params:
+            raise ValueError(f"{self.path} se grabó con otros parámetros")
+        if start_day != self.start_day:
+            raise ValueError(f"{self.path} empieza en el día {self.start_day}, no en el {start_day}")
+
+    def append_rows(self, foxes, rabbits, carrots):
+        """Añadir columnas de igual longitud como filas intercaladas"""
+        count = len(foxes)
+        block = array(self.typecode, bytes(count * len(COLUMNS) * array(self.typecode).itemsize))
+        for k, column in enumerate((foxes, rabbits, carrots)):
+            block[k::len(COLUMNS)] = array(self.typecode, column)
+        block.tofile(self.file)
+        self.rows += count
+
+    def append(self, foxes, rabbits, carrots):
+        self.append_rows((foxes,), (rabbits,), (carrots,))
+
+    def truncate(self, rows):
+        """Descartar las filas desde ``rows`` y seguir escribiendo a partir de ahí"""
+        row_size = array(self.typecode).itemsize * len(COLUMNS)
+        self.rows = min(rows, self.rows)
+        self.file.truncate(self.data_offset + self.rows * row_size)
+        self.file.seek(0, os.SEEK_END)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class TrajectoryRecorder:
+    """Observador del motor que vuelca en disco las filas nuevas del historial.
+
+    Cada reinicio del motor empieza un archivo nuevo (``ruta``, ``ruta.1``, ...)
+    que reemplaza al que hubiera con ese nombre; sólo ``rewind`` continúa un
+    archivo existente.
+    """
+
+    def __init__(self, engine, path, typecode='d'):
+        self.engine = engine
+        self.base_path = path
+        self.typecode = typecode
+        self.run_index = 0
+        self.path = path
+        self.writer = None
+        self.written = 0
+        engine.add_observer(self)
+
+    def __call__(self, engine):
+        history = engine.history
+        if history.length < self.written or self.writer is None:
+            self.start_file(history)
+        if history.length > self.written:
+            rows = history.rows(self.written, history.length)
+            self.writer.append_rows(rows['foxes'], rows['rabbits'], rows['carrots'])
+            self.writer.flush()
+            self.written = history.length
+
+    def start_file(self, history):
+        if self.writer:
+            self.writer.close()
+            self.run_index += 1
+        self.path = self.base_path if self.run_index == 0 else f"{self.base_path}.{self.run_index}"
+        start_day = history.buffers['day'][0] if history.length else self.engine.day
+        self.writer = TrajectoryWriter(self.path, self.engine.params, self.typecode, start_day)
+        self.written = 0
+
+    def rewind(self, rows, params, start_day):
+        """Seguir grabando el archivo actual desde la fila ``rows``.
+
+        Lo usa la restauración de un punto de control cuando el historial en
+        memoria vuelve a coincidir con las primeras ``rows`` filas del archivo.
+        El encabezado debe coincidir con ``params`` y ``start_day`` del punto
+        de control y el archivo debe tener al menos ``rows`` filas; si no, se
+        lanza ``ValueError``.
+        """
+        if self.writer is None:
+            self.writer = TrajectoryWriter(self.path, params, self.typecode, start_day, resume=True)
+        else:
+            self.writer.check(params, start_day)
+        if rows > self.writer.rows:
+            raise ValueError(f"{self.path} tiene {self.writer.rows} filas; faltan hasta la {rows}")
+        self.writer.truncate(rows)
+        self.written = self.writer.rows
+
+    def close(self):
+        self.engine.remove_observer(self)
+        if self.writer:
+            self.writer.close()
+
+
+class TrajectoryFile:
+    """Lectura por ``mmap`` de un archivo de trayectoria"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.header, self.data_offset = read_header(f)
+        if self.header['byteorder'] != sys.byteorder:
+            raise ValueError(f"{path} se escribió con otro orden de bytes")
+        self.params = self.header['params']
+        self.start_day = self.header['start_day']
+        self.typecode = self.header['typecode']
+        self.row_size = array(self.typecode).itemsize * len(COLUMNS)
+        self.file = open(path, 'rb')
+        self.map = None
+        self.refresh()
+
+    def refresh(self):
+        """Volver a mapear el archivo para ver las filas añadidas por otro proceso"""
+        size = os.path.getsize(self.path)
+        self.length = max(0, (size - self.data_offset) // self.row_size)
+        # El mapa anterior se libera solo cuando ya no quedan vistas sobre él
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def column(self, name):
+        """Vista sin copia (con salto entre filas) de una columna"""
+        if name == 'day':
+            return range(self.start_day, self.start_day + self.length)
+        end = self.data_offset + self.length * self.row_size
+        values = memoryview(self.map)[self.data_offset:end].cast(self.typecode)
+        return values[COLUMNS.index(name)::len(COLUMNS)]
+
+    def as_numpy(self):
+        """Arreglo estructurado ``np.memmap`` con una columna por especie"""
+        import numpy as np
+
+        dtype = np.dtype([(name, self.typecode) for name in COLUMNS])
+        return np.memmap(self.path, dtype=dtype, mode='r',
+                         offset=self.data_offset, shape=(self.length,))
+
+    def close(self):
+        self.map = None
+        self.file.close()
+
+
+class MappedHistory(HistoryStore):
+    """Historial de sólo lectura sobre un archivo de trayectoria.
+
+    Tiene la misma interfaz que ``HistoryStore`` (columnas, agregados,
+    ventanas y pirámides de reducción), así que los gráficos y el análisis
+    pueden recorrer corridas de 10^8 días sin cargarlas en memoria.
+
+    Los agregados se calculan con NumPy sobre el archivo mapeado. ``prepare``
+    construye las pirámides en un hilo aparte y activa ``ready`` al terminar;
+    mientras tanto la interfaz no debe leer agregados ni pirámides.
+    """
+
+    def __init__(self, trajectory):
+        self.trajectory = trajectory
+        self.ready = threading.Event()
+        super().__init__()
+
+    def prepare(self):
+        """Calcular agregados y pirámides en segundo plano (ver ``ready``)"""
+        self.ready.clear()
+        threading.Thread(target=self._prepare, daemon=True).start()
+
+    def _prepare(self):
+        self.stats('day')
+        for name in COLUMNS:
+            self.pyramid(name).update()
+        self.ready.set()
+
+    def pyramid(self, name):
+        pyramid = self.pyramids.get(name)
+        if pyramid is None:
+            pyramid = self.pyramids[name] = MinMaxPyramid(self, name, MAPPED_BASE_LEVEL)
+        return pyramid
+
+    def stats(self, name):
+        if self.aggregated < self.length:
+            start, end = self.aggregated, self.length
+            data = self.trajectory.as_numpy()[start:end]
+            first = self.trajectory.start_day + start
+            last = self.trajectory.start_day + end - 1
+            self.running['day'].merge(end - start, (first + last) * (end - start) // 2,
+                                      first, last, last)
+            for column in COLUMNS:
+                values = data[column]
+                self.running[column].merge(len(values), float(values.sum()), float(values.min()),
+                                           float(values.max()), float(values[-1]))
+            self.aggregated = end
+        return self.running[name]
+
+    def _allocate(self, capacity):
+        trajectory = self.trajectory
+        self.buffers = {name: trajectory.column(name) for name in ('day',) + COLUMNS}
+        self.length = self.capacity = trajectory.length
+
+    def refresh(self):
+        self.trajectory.refresh()
+        self._allocate(0)
+
+    def reserve(self, extra):
+        raise TypeError("El historial de un archivo de trayectoria es de sólo lectura")
+
+    def append(self, day, foxes, rabbits, carrots):
+        self.reserve(1)
+
+    def extend(self, rows):
+        self.reserve(len(rows['day']))
+
+    def truncate(self, length):
+        raise TypeError("El historial de un archivo de trayectoria es de sólo lectura")
+
+    def __getitem__(self, name):
+        return self.buffers[name][:self.length]
+
+    @property
+    def nbytes(self):
+        return 0
@@ -0,0 +1,127 @@
+"""Caché LRU de transiciones del modelo diario, con saltos de varios días.
+
+La clave es ``(parámetros, nivel, estado cuantizado)`` y el valor, el estado
+tras ``2**nivel`` días junto con el primer día del bloque en que cada especie
+vale cero. Un salto de ``n`` días se descompone en potencias de dos (tablas
+de duplicación): cuando la corrida entra en un punto fijo o un ciclo, los
+bloques se repiten y avanzar millones de días cuesta unas pocas búsquedas.
+
+Sin repeticiones la caché no acelera nada (cada día sigue calculándose una
+vez), así que está pensada para horizontes largos, barridos con
+``tolerance`` y repeticiones de corridas con los mismos parámetros.
+"""
+
+import sys
+from collections import OrderedDict
+
+from ecosystem_engine import EcosystemEngine, next_state
+from steady_state import quantize
+
+
+def params_key(params):
+    """Clave de los parámetros: la tupla misma, que se compara por igualdad
+    (un hash de Python puede coincidir para parámetros distintos)"""
+    return tuple(sorted(params.items()))
+
+
+def entry_bytes(cache_key, entry):
+    """Bytes de los objetos de una entrada (sin contar la tupla de parámetros,
+    compartida por todas las entradas de un escenario)"""
+    _, level, quantized = cache_key
+    state, zeros = entry
+    return (sys.getsizeof(cache_key) + sys.getsizeof(level) + sys.getsizeof(entry)
+            + sum(sys.getsizeof(item) for item in (quantized, state, zeros))
+            + sum(sys.getsizeof(value) for value in quantized + state + zeros))
+
+
+class TransitionCache:
+    def __init__(self, max_bytes=64 * 2 ** 20, tolerance=0.0):
+        """``max_bytes`` limita la memoria medida con ``sys.getsizeof``: la del
+        diccionario ordenado más la de los objetos de cada entrada."""
+        self.max_bytes = max_bytes
+        self.tolerance = tolerance
+        self.entries = OrderedDict()
+        self.entry_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self.entries) + self.entry_bytes
+
+    def stats(self):
+        return {'entries': len(self.entries), 'nbytes': self.nbytes, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+    def clear(self):
+        self.entries.clear()
+        self.entry_bytes = 0
+
+    def block(self, state, params, key, level):
+        """(estado tras ``2**level`` días, primer día con cero de cada especie o -1)"""
+        cache_key = (key, level, quantize(state, self.tolerance))
+        entries = self.entries
+        entry = entries.get(cache_key)
+        if entry is not None:
+            entries.move_to_end(cache_key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+
+        if level == 0:
+            zeros = tuple(0 if value == 0 else -1 for value in state)
+            entry = (next_state(state[0], state[1], state[2], params), zeros)
+        else:
+            half = 1 << (level - 1)
+            middle, first = self.block(state, params, key, level - 1)
+            end, second = self.block(middle, params, key, level - 1)
+            zeros = tuple(a if a >= 0 else (b + half if b >= 0 else -1)
+                          for a, b in zip(first, second))
+            entry = (end, zeros)
+
+        entries[cache_key] = entry
+        self.entry_bytes += entry_bytes(cache_key, entry)
+        while len(entries) > 1 and self.nbytes > self.max_bytes:
+            self.entry_bytes -= entry_bytes(*entries.popitem(last=False))
+            self.evictions += 1
+        return entry
+
+    def step(self, state, params):
+        """Estado del día siguiente"""
+        return self.block(tuple(state), params, params_key(params), 0)[0]
+
+    def jump(self, state, params, days):
+        """Avanzar ``days`` días: (estado final, primer día con cero de cada especie o -1)"""
+        key = params_key(params)
+        state = tuple(state)
+        zeros = [-1, -1, -1]
+        offset = 0
+        for level in reversed(range(days.bit_length())):
+            if days >> level & 1:
+                state, first = self.block(state, params, key, level)
+                for i, day in enumerate(first):
+                    if zeros[i] < 0 and day >= 0:
+                        zeros[i] = offset + day
+                offset += 1 << level
+        return state, tuple(zeros)
+
+
+def fast_forward(engine, days, cache):
+    """Adelantar el motor ``days`` días con la caché, sin registrar esos días.
+
+    El historial se vacía porque quedaría con un hueco. Devuelve, para cada
+    especie, el primer día (absoluto) con población cero o -1.
+    """
+    if type(engine) is not EcosystemEngine:
+        raise TypeError("La caché de transiciones sólo sirve para el modelo diario discreto")
+    start = engine.day
+    state, zeros = cache.jump((engine.foxes, engine.rabbits, engine.carrots), engine.params, days)
+    engine.day += days
+    engine.foxes, engine.rabbits, engine.carrots = state
+    engine.history.clear()
+    engine.notify()
+    return tuple(start + day if day >= 0 else -1 for day in zeros)